@@ -10,15 +10,593 @@ Supports:
 import streamlit as st
 import streamlit.components.v1 as components
 import asyncio
+import functools
+import hashlib
 import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Optional
 
-from services.anam_service import anam_service
-from services.tools_service import mem0_service
-from services.voice_service import voice_service
-from services.llm_service import llm_service
+import httpx
+
+try:
+    from orjson import loads as _json_loads, dumps as _json_dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# Use uvloop's C-level event loop when available; every blocking call in
+# this app funnels through the shared loop, so loop overhead multiplies
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Service modules are imported lazily at their point of use: they pull in
+# httpx, LLM SDKs, Mem0 and ChromaDB, which a user who never starts a
+# session should not pay for at first paint.
 from config.settings import settings
 
+# ========================
+# ASYNC HELPERS
+# ========================
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a single background event loop shared across all reruns.
+
+    Streamlit re-executes the script on every interaction; creating a fresh
+    event loop per call tears down HTTP keep-alive connections each time.
+    One persistent loop on a daemon thread keeps connection pools warm.
+    """
+    loop = asyncio.new_event_loop()
+
+    def _run():
+        # Register the loop as current for the worker thread so libraries
+        # that call asyncio.get_event_loop() inside coroutines find it
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    return loop
+
+
+def run_async(coro):
+    """Run a coroutine on the shared background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+
+def submit_async(coro):
+    """Schedule a coroutine on the shared loop without blocking.
+
+    Returns a concurrent.futures.Future; call .result() when the value is
+    actually needed so independent work can proceed in the meantime.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+@st.cache_resource
+def get_http_client():
+    """
+    Create a single httpx.AsyncClient shared across reruns.
+
+    Opening a new client per message forces a fresh TCP handshake to the
+    backend on every turn; a cached client pools connections so they are
+    reused for the lifetime of the Streamlit process.
+    """
+    return httpx.AsyncClient(
+        # Multiplex the long-lived SSE stream and any concurrent calls
+        # over one socket; HPACK also compresses the repeated headers
+        http2=True,
+        # No read deadline on streams — the backend controls turn length —
+        # but still fail fast when it isn't reachable at all
+        timeout=httpx.Timeout(180.0, connect=5.0, read=None),
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
+
+
+# ========================
+# AGENT INFO (static)
+# ========================
+
+AGENTS_INFO = {
+    "research": {
+        "icon": "🔍",
+        "description": "Web research, articles, and information gathering",
+        "tools": ["News search", "ChromaDB RAG", "Document retrieval"]
+    },
+    "finance": {
+        "icon": "💰",
+        "description": "Financial information, stocks, and investment advice",
+        "tools": ["Financial news", "Market data", "Investment guidance"]
+    },
+    "travel": {
+        "icon": "✈️",
+        "description": "Flights, hotels, and trip planning",
+        "tools": ["Flight search", "Hotel booking", "Travel guides"]
+    },
+    "shopping": {
+        "icon": "🛍️",
+        "description": "Product recommendations and shopping assistance",
+        "tools": ["Product search", "Price comparison", "Recommendations"]
+    },
+    "jobs": {
+        "icon": "💼",
+        "description": "Job search and career advice",
+        "tools": ["Google Jobs search", "Resume tips", "Career guidance"]
+    },
+    "recipes": {
+        "icon": "👨🍳",
+        "description": "Recipe discovery with ratings and ingredients",
+        "tools": ["Recipe search", "Ingredient lookup", "Cooking tips"]
+    }
+}
+
+
+# AGENTS_INFO never changes at runtime, so render each card to a single
+# markdown string once at import; the tab then issues one st.markdown per
+# card instead of 4-6 element calls each
+AGENT_CARDS = [
+    (
+        f"### {info['icon']} {agent_name.title()}\n\n"
+        f"{info['description']}\n\n"
+        "*Available tools:*\n"
+        + "\n".join(f"- {tool}" for tool in info["tools"])
+    )
+    for agent_name, info in AGENTS_INFO.items()
+]
+
+
+@st.fragment
+def render_agents_tab():
+    """Render the agent cards; as a fragment this only re-runs when the
+    panel itself is interacted with, not on every chat keystroke."""
+    cols = st.columns(2)
+    for idx, card in enumerate(AGENT_CARDS):
+        with cols[idx % 2]:
+            with st.container(border=True):
+                st.markdown(card)
+
+    # Show last used agent
+    if st.session_state.last_agent:
+        st.divider()
+        st.info(f"Last agent used: **{st.session_state.last_agent}**")
+
+
+@st.fragment
+def render_memory_tab():
+    """Memory tab body; interactions with its expanders re-run just this
+    block, and full reruns stop at the 30 s fetch cache."""
+    if settings.mem0_enabled:
+        # Retrieve user memories (cached for 30 s across reruns)
+        try:
+            memories = fetch_memories(st.session_state.user_id, 10)
+
+            if memories:
+                st.write(f"📚 Found {len(memories)} memories:")
+                for i, memory in enumerate(memories, 1):
+                    with st.expander(f"Memory {i}"):
+                        st.write(memory.get("message", ""))
+                        if "metadata" in memory:
+                            st.caption(f"Metadata: {memory['metadata']}")
+            else:
+                st.info("No memories stored yet. Start chatting to create memories!")
+
+        except Exception as e:
+            st.warning(f"Could not retrieve memories: {e}")
+    else:
+        st.info("💾 Mem0 integration not enabled. Enable in settings to use long-term memory.")
+
+
+@st.fragment
+def render_avatar_tab():
+    """Avatar tab body; speak/refresh/end buttons re-run this fragment
+    alone, so chat keystrokes no longer rebuild the embed controls."""
+    from services.anam_service import anam_service
+
+    # Check avatar configuration
+    is_configured = anam_service.is_configured()
+
+    if st.session_state.anam_session_token:
+        session = st.session_state.anam_session_token
+        is_demo = session.get("isDemo", False)
+
+        # Status header
+        if is_demo:
+            st.warning("🎭 Demo Mode - Configure ANAM_API_KEY for live video")
+        else:
+            st.success("🎭 Live Avatar Connected")
+
+        # Avatar info bar
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Name", session.get("personaName", "AI Assistant"))
+        with col2:
+            st.metric("Mode", "Demo" if is_demo else "Live")
+        with col3:
+            st.metric("Status", "🟢 Active")
+
+        st.markdown("---")
+
+        # Get session token
+        session_token = session.get("sessionToken", "demo-token")
+
+        # Test speak section
+        st.markdown("### Make Avatar Speak")
+        test_text = st.text_input("Enter text for avatar to speak:", value="Hello! I am your AI assistant.", key="test_avatar_text")
+
+        # Get current speaking text from session state
+        current_speak_text = st.session_state.get("avatar_speak_text", "")
+
+        if st.button("🎤 Speak Now", key="test_speak_avatar"):
+            st.session_state.avatar_speak_text = test_text
+            st.rerun()
+
+        # Show speaking status
+        if current_speak_text:
+            st.success(f"🗣️ Speaking: \"{current_speak_text[:80]}...\"" if len(current_speak_text) > 80 else f"🗣️ Speaking: \"{current_speak_text}\"")
+
+        st.markdown("---")
+
+        # Avatar video display - with speaking text if any
+        st.markdown("### Avatar Video")
+        avatar_html = embed_html_cached(
+            session_token, 450, 340,
+            speaking_text=current_speak_text
+        )
+        components.html(avatar_html, height=360)
+
+        # Clear speaking text after rendering
+        if current_speak_text:
+            st.session_state.avatar_speak_text = ""
+
+        # Controls
+        st.markdown("### Session Controls")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if st.button("🔄 Refresh Session", key="refresh_avatar_tab"):
+                st.info("Refreshing avatar session...")
+                st.rerun()
+
+        with col2:
+            if st.button("⏹️ End Session", key="stop_avatar_tab"):
+                # End the session properly
+                if not is_demo:
+                    try:
+                        run_async(
+                            anam_service.end_session(session.get("sessionId", ""))
+                        )
+                    except Exception:
+                        pass
+                st.session_state.anam_session_token = None
+                st.success("Avatar session ended!")
+                st.rerun()
+
+    else:
+        # No active session - show start options
+        st.info("🤖 Start an avatar session to enable AI video interactions")
+
+        # Configuration status
+        if is_configured:
+            st.success("✅ Anam AI API configured")
+        else:
+            st.warning("⚠️ Anam AI not configured - Demo mode available")
+            st.caption("Add ANAM_API_KEY to your .env file for live video")
+
+        st.markdown("---")
+
+        # Avatar preview placeholder
+        preview_html = embed_html_cached("demo-preview", 400, 300)
+        components.html(preview_html, height=320)
+
+        st.markdown("---")
+
+        # Start button
+        if st.button("🎬 Start Avatar Session", key="start_avatar_tab", type="primary"):
+            with st.spinner("Initializing avatar..."):
+                try:
+                    session_data = run_async(
+                        anam_service.create_session_token(persona_name="AI Assistant")
+                    )
+
+                    if session_data:
+                        st.session_state.anam_session_token = session_data
+                        is_demo = session_data.get("isDemo", False)
+                        if is_demo:
+                            st.success("🎭 Demo avatar started!")
+                        else:
+                            st.success("🎭 Live avatar connected!")
+                        st.rerun()
+                    else:
+                        st.error("Failed to create avatar session")
+
+                except Exception as e:
+                    st.error(f"Error starting avatar: {e}")
+                    st.info("💡 Check your ANAM_API_KEY configuration")
+
+
+# Summaries memoized by content hash (LRU, capped); reruns that hand the
+# same response text back in skip the LLM call entirely
+_summary_cache: "OrderedDict[str, str]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 256
+
+
+def _text_fingerprint(text: str) -> str:
+    """Compact stable key for response text."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+async def _summarize_and_start_tts(text: str):
+    """Produce the spoken summary and launch TTS in a single loop pass.
+
+    Summary and TTS previously cost one sync->async bounce each; here the
+    TTS task is created on the loop the moment the summary exists, and the
+    caller gets (summary, tts_task) back so rendering can proceed while
+    audio generates.
+    """
+    from services.llm_service import llm_service
+    from services.voice_service import voice_service
+
+    key = _text_fingerprint(text)
+    summary = _summary_cache.get(key)
+    if summary is None:
+        try:
+            summary = await llm_service.summarize_text(text)
+        except Exception as sum_err:
+            print(f"Summarization error: {sum_err}")
+            summary = None
+        if summary:
+            # Only real summaries are cached; pinning the truncated
+            # fallback would lock a transient LLM failure in for good
+            _summary_cache[key] = summary
+            if len(_summary_cache) > _SUMMARY_CACHE_MAX:
+                _summary_cache.popitem(last=False)
+        else:
+            summary = text[:300] + "..."
+    else:
+        _summary_cache.move_to_end(key)
+
+    tts_task = asyncio.create_task(voice_service.text_to_speech(summary))
+    return summary, tts_task
+
+
+async def _await_task(task):
+    """Await a task created on the shared loop from sync code."""
+    return await task
+
+
+@functools.lru_cache(maxsize=64)
+def _embed_html(session_token: str, width: int, height: int, speaking_text) -> str:
+    """Process-level embed memo; outlives st.cache_data invalidations."""
+    from services.anam_service import anam_service
+
+    return anam_service.get_embed_html(
+        session_token, width=width, height=height, speaking_text=speaking_text
+    )
+
+
+@st.cache_data(max_entries=32)
+def embed_html_cached(session_token: str, width: int, height: int, speaking_text=None) -> str:
+    """Avatar embed HTML memoized on (token, size, text).
+
+    The chat and Avatar tabs re-request the same embed on every rerun;
+    identical inputs come straight from memory instead of re-templating
+    the multi-kilobyte HTML/JS blob. Backed by an lru_cache so a data-
+    cache clear still skips re-templating.
+    """
+    return _embed_html(session_token, width, height, speaking_text)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_memories(user_id: str, limit: int):
+    """Fetch Mem0 memories with a short TTL.
+
+    The Memory tab body executes on every rerun regardless of which tab
+    is active, so an uncached call here would hit Mem0 on every
+    keystroke in the chat input.
+    """
+    from services.tools_service import get_mem0_service
+
+    return run_async(
+        get_mem0_service().retrieve_memories(user_id=user_id, limit=limit)
+    )
+
+
+# Settings don't change at runtime, so build this label once at import
+_MEM0_STATUS = "Enabled" if settings.mem0_enabled else "Disabled"
+
+
+@st.fragment
+def _render_session_panel():
+    """Sidebar session-info panel, isolated so chat-input keystrokes don't
+    rebuild its f-string on every rerun."""
+    st.info(f"""
+    **👤 Active User:** {st.session_state.user_id}
+
+    **📍 Session:** {st.session_state.session_id}
+
+    **🧠 Memory:** {_MEM0_STATUS}
+    """)
+
+
+# Cap stored turns so long sessions don't grow session_state unboundedly
+MAX_HISTORY_MESSAGES = 200
+# Only this many recent messages render inline; the rest live in an expander
+RECENT_HISTORY_WINDOW = 20
+
+
+def _render_history_message(msg):
+    """Render a single stored conversation message.
+
+    Assistant entries carry pre-rendered markdown blocks (built once when
+    the turn is appended) so replaying history is a handful of
+    st.markdown calls rather than st.write's type dispatch per field.
+    """
+    if msg["role"] == "user":
+        st.chat_message("user").markdown(msg["content"])
+        return
+
+    with st.chat_message("assistant"):
+        # Standard response display
+        if "summary" in msg:
+            tab_sum, tab_det, tab_audio = st.tabs(["📝 Summary", "📄 Full Detail", "🔊 Audio"])
+            with tab_sum:
+                st.markdown(msg.get("rendered_summary_md") or msg["summary"])
+            with tab_det:
+                st.markdown(msg.get("rendered_detail_md") or msg["content"])
+            with tab_audio:
+                audio_bytes = st.session_state.audio_store.get(msg.get("audio_id"))
+                if audio_bytes:
+                    st.audio(audio_bytes, format="audio/mp3")
+                else:
+                    st.info("Audio not available")
+        else:
+            st.markdown(msg.get("rendered_detail_md") or msg["content"])
+
+        if "agent" in msg:
+            agent_name = msg.get("agent", "unknown")
+            avatar_indicator = " 🎭" if st.session_state.anam_session_token else ""
+            st.caption(f"Agent: {agent_name}{avatar_indicator}")
+
+
+# Sentinel marking the end of a token stream
+_STREAM_DONE = object()
+
+# Minimum seconds between visual flushes while streaming; each yielded
+# item costs a full frontend repaint, so tokens are coalesced in between
+_STREAM_FLUSH_INTERVAL = 0.1
+
+
+def _stream_tokens(payload, stream_state):
+    """Yield response deltas as they arrive from the backend.
+
+    The SSE stream is consumed on the shared background loop and bridged
+    into this sync generator through a queue, so st.write_stream can paint
+    tokens incrementally instead of waiting for the full response. The
+    routed agent and the final joined text are recorded in stream_state.
+    """
+    token_queue = queue.Queue()
+
+    async def pump():
+        try:
+            client = get_http_client()
+            async with client.stream(
+                "POST",
+                "http://localhost:8000/multi-agent/stream",
+                # Encode once with orjson instead of letting httpx run the
+                # payload back through stdlib json.dumps
+                content=_json_dumps(payload),
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                # Split SSE events at the byte level instead of
+                # paying aiter_lines' per-chunk decode + splitlines
+                buf = b""
+                async for chunk in response.aiter_bytes():
+                    buf += chunk
+                    while b"\n\n" in buf:
+                        event, buf = buf.split(b"\n\n", 1)
+                        if not event.startswith(b"data: "):
+                            continue
+                        body = event[6:].strip()
+                        # Skip keep-alives/empty payloads without paying
+                        # for a JSON decode attempt
+                        if not body.startswith(b"{"):
+                            continue
+                        data = _json_loads(body)
+                        if "content" in data:
+                            token_queue.put(data.get("content", ""))
+                            stream_state["agent"] = data.get("agent", stream_state["agent"])
+        except Exception as stream_error:
+            # Set a fallback response for testing
+            token_queue.put(
+                f"Backend connection failed: {stream_error}. This is a test response to verify the UI works."
+            )
+            stream_state["agent"] = "test_agent"
+        finally:
+            token_queue.put(_STREAM_DONE)
+
+    future = submit_async(pump())
+    chunks = []
+    # Coalesce tokens between flushes: the backend can emit dozens of
+    # deltas per 100 ms and repainting each one individually dominates
+    # render cost without making the stream feel any faster
+    pending = []
+    last_flush = time.monotonic()
+    while True:
+        token = token_queue.get()
+        if token is _STREAM_DONE:
+            break
+        chunks.append(token)
+        pending.append(token)
+        now = time.monotonic()
+        if now - last_flush >= _STREAM_FLUSH_INTERVAL or "\n" in token:
+            yield "".join(pending)
+            pending.clear()
+            last_flush = now
+    if pending:
+        yield "".join(pending)
+    future.result()
+    stream_state["text"] = "".join(chunks)
+
+
+def _transcribe_streaming(audio_buf) -> str:
+    """Transcribe a recording, painting partial text as segments finish.
+
+    Consumes VoiceService.transcribe_audio_stream on the shared
+    background loop and bridges segments through a queue — the same
+    pattern _stream_tokens uses — so long recordings show their first
+    words while later audio is still transcribing. Returns the full
+    joined transcript.
+    """
+    from services.voice_service import voice_service
+
+    segment_queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for segment in voice_service.transcribe_audio_stream(audio_buf):
+                segment_queue.put(segment)
+        finally:
+            segment_queue.put(_STREAM_DONE)
+
+    future = submit_async(pump())
+    placeholder = st.empty()
+    placeholder.caption("🎙️ Transcribing...")
+    parts = []
+    while True:
+        segment = segment_queue.get()
+        if segment is _STREAM_DONE:
+            break
+        parts.append(segment)
+        placeholder.caption(f"🎙️ {' '.join(parts)}")
+    future.result()
+    placeholder.empty()
+    return " ".join(parts)
+
+
+def _audio_fingerprint(uploaded_audio) -> str:
+    """
+    Cheap dedupe key for a recorded audio buffer.
+
+    Hashes the total length plus the first and last 64 KB so reruns
+    don't pay a full-buffer hash, and reads through getbuffer() to
+    avoid copying the underlying BytesIO the way getvalue() does.
+    Against the previous upload that sampling is sufficient.
+    """
+    buf = uploaded_audio.getbuffer()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(buf).to_bytes(8, "little"))
+    digest.update(buf[:65536])
+    digest.update(buf[-65536:])
+    return digest.hexdigest()
+
 # ========================
 # PAGE CONFIG
 # ========================
@@ -36,7 +614,7 @@ st.caption("Supervisor-Orchestrated Specialized Agents with Multi-Modal Interact
 # STYLING
 # ========================
 
-st.markdown("""
+_PAGE_CSS = """
 <style>
     .main > div {
         padding-top: 2rem;
@@ -58,30 +636,44 @@ st.markdown("""
     .agent-jobs { background: #fce4ec; color: #c2185b; }
     .agent-recipes { background: #f1f8e9; color: #558b2f; }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Re-emit on every run: Streamlit drops elements a rerun doesn't produce,
+# so a once-per-session guard would lose the styling after the first
+# interaction. The constant keeps the string build out of the hot path.
+st.markdown(_PAGE_CSS, unsafe_allow_html=True)
 
 # ========================
 # SESSION INITIALIZATION
 # ========================
 
-if "session_id" not in st.session_state:
-    st.session_state.session_id = None
-if "user_id" not in st.session_state:
-    st.session_state.user_id = None
-if "anam_session_token" not in st.session_state:
-    st.session_state.anam_session_token = None
-if "interaction_mode" not in st.session_state:
-    st.session_state.interaction_mode = "text"
+_SESSION_DEFAULTS = {
+    "session_id": None,
+    "user_id": None,
+    "anam_session_token": None,
+    "interaction_mode": "text",
+    "last_agent": None,
+    "last_processed_audio": None,
+    "last_cheap_audio_id": None,
+}
+
+for key, default in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, default)
+
+# Mutable containers need a fresh instance per session
 if "user_memories" not in st.session_state:
     st.session_state.user_memories = []
 if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
-if "last_agent" not in st.session_state:
-    st.session_state.last_agent = None
-if "last_processed_audio" not in st.session_state:
-    st.session_state.last_processed_audio = None
-if "anam_session_token" not in st.session_state:
-    st.session_state.anam_session_token = None
+    st.session_state.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
+# TTS clips live here keyed by id; history entries only carry the key, so
+# session_state copies per rerun stay proportional to text, not MP3 size
+if "audio_store" not in st.session_state:
+    st.session_state.audio_store = {}
+
+# Normalize legacy modes here rather than forcing an extra rerun at the
+# bottom of the chat tab
+if st.session_state.interaction_mode not in ["text", "voice"]:
+    st.session_state.interaction_mode = "text"
 
 # ========================
 # SIDEBAR: SESSION MANAGEMENT
@@ -98,16 +690,15 @@ with st.sidebar:
         user_id = user_name.lower().replace(" ", "-")
         session_id = f"session-{user_id}"
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         try:
             # Create Zep user and thread
-            
+
             # Initialize Mem0
             if settings.mem0_enabled:
-                loop.run_until_complete(
-                    mem0_service.add_memory(
+                from services.tools_service import get_mem0_service
+
+                run_async(
+                    get_mem0_service().add_memory(
                         user_id=user_id,
                         message=f"Session started for {user_name}",
                         metadata={"session_id": session_id}
@@ -117,8 +708,9 @@ with st.sidebar:
             st.session_state.user_id = user_id
             st.session_state.session_id = session_id
             st.session_state.anam_session_token = None
-            st.session_state.conversation_history = []
+            st.session_state.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
             st.session_state.user_memories = []
+            st.session_state.audio_store = {}
             
             st.success(f"✅ Session initialized for {user_name}!")
             st.rerun()
@@ -129,14 +721,8 @@ with st.sidebar:
     # Display session info
     if st.session_state.session_id:
         st.divider()
-        st.info(f"""
-        **👤 Active User:** {st.session_state.user_id}
-        
-        **📍 Session:** {st.session_state.session_id}
-        
-        **🧠 Memory:** {'Enabled' if settings.mem0_enabled else 'Disabled'}
-        """)
-        
+        _render_session_panel()
+
         if st.button("End Session", type="secondary"):
             st.session_state.session_id = None
             st.session_state.user_id = None
@@ -169,34 +755,18 @@ if st.session_state.session_id:
             avatar_label = "🎭 Avatar Active" if not is_demo else "🎭 Demo Mode"
             st.success(avatar_label)
         
-        # Display conversation history
+        # Display conversation history (recent window inline, rest collapsed)
         if st.session_state.conversation_history:
             st.markdown("### Conversation")
-            for msg in st.session_state.conversation_history:
-                if msg["role"] == "user":
-                    st.chat_message("user").write(msg["content"])
-                else:
-                    with st.chat_message("assistant"):
-                        # Standard response display
-                        if "summary" in msg:
-                            tab_sum, tab_det, tab_audio = st.tabs(["📝 Summary", "📄 Full Detail", "🔊 Audio"])
-                            with tab_sum:
-                                st.write(msg["summary"])
-                            with tab_det:
-                                st.write(msg["content"])
-                            with tab_audio:
-                                if "audio_bytes" in msg and msg["audio_bytes"]:
-                                    st.audio(msg["audio_bytes"], format="audio/mp3")
-                                else:
-                                    st.info("Audio not available")
-                        else:
-                            st.write(msg["content"])
+            history = list(st.session_state.conversation_history)
+            older, recent = history[:-RECENT_HISTORY_WINDOW], history[-RECENT_HISTORY_WINDOW:]
+            if older:
+                with st.expander(f"Older messages ({len(older)})", expanded=False):
+                    for msg in older:
+                        _render_history_message(msg)
+            for msg in recent:
+                _render_history_message(msg)
 
-                        if "agent" in msg:
-                            agent_name = msg.get("agent", "unknown")
-                            avatar_indicator = " 🎭" if st.session_state.anam_session_token else ""
-                            st.caption(f"Agent: {agent_name}{avatar_indicator}")
-        
 
         # --- UNIFIED INPUT AREA ---
         # Place voice input just above the bottom text input
@@ -214,20 +784,25 @@ if st.session_state.session_id:
 
         # Check Voice
         if voice_audio:
-             # Check hash to prevent re-processing same audio on rerun
-            audio_id = hash(voice_audio.getvalue())
-            if audio_id != st.session_state.last_processed_audio:
-                with st.spinner("Transcribing Voice..."):
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    transcription = loop.run_until_complete(
-                        voice_service.transcribe_audio(voice_audio.getvalue())
-                    )
-                
-                if transcription:
-                    user_input = transcription
-                    is_voice = True
-                    st.session_state.last_processed_audio = audio_id
+            # Cheap identity check first: an unchanged recording is the
+            # common case on every unrelated rerun, and comparing ~128
+            # bytes beats rehashing the sample windows each time
+            buf = voice_audio.getbuffer()
+            cheap_id = (len(buf), bytes(buf[:64]), bytes(buf[-64:]))
+            if cheap_id != st.session_state.last_cheap_audio_id:
+                # Check hash to prevent re-processing same audio on rerun
+                audio_id = _audio_fingerprint(voice_audio)
+                if audio_id != st.session_state.last_processed_audio:
+                    # getbuffer() hands the service a zero-copy view; long
+                    # recordings paint words as each segment transcribes
+                    # instead of blocking on the whole clip
+                    transcription = _transcribe_streaming(buf)
+
+                    if transcription:
+                        user_input = transcription
+                        is_voice = True
+                        st.session_state.last_processed_audio = audio_id
+                        st.session_state.last_cheap_audio_id = cheap_id
         
         # Check Text (Override voice if both present? Usually handle one)
         if text_input_val:
@@ -252,92 +827,37 @@ if st.session_state.session_id:
             
             # Get response from backend
             try:
-                import httpx
-
-                # Show processing message
-                processing_placeholder = st.empty()
-                processing_placeholder.write("🤔 Processing...")
-
+                # History stays server-side, keyed by session_id; only the
+                # new message travels over the wire each turn
                 payload = {
                     "user_id": st.session_state.user_id,
                     "session_id": st.session_state.session_id,
                     "message": user_input,
                     "mode": "voice" if is_voice else "text",
-                    "conversation_history": [
-                        {"role": msg["role"], "content": msg["content"]}
-                        for msg in st.session_state.conversation_history[:-1]
-                    ]
                 }
 
                 # Stream from /multi-agent/stream endpoint
                 stream_state = {"text": "", "agent": "unknown"}
 
-                async def stream_response():
-                    try:
-                        async with httpx.AsyncClient(timeout=180.0) as client:
-                            async with client.stream(
-                                "POST",
-                                "http://localhost:8000/multi-agent/stream",
-                                json=payload
-                            ) as response:
-                                async for line in response.aiter_lines():
-                                    if line.startswith("data: "):
-                                        data = json.loads(line[6:])
-                                        if "content" in data:
-                                            stream_state["text"] += data.get("content", "")
-                                            stream_state["agent"] = data.get("agent", stream_state["agent"])
-                    except Exception as stream_error:
-                        # Set a fallback response for testing
-                        stream_state["text"] = f"Backend connection failed: {stream_error}. This is a test response to verify the UI works."
-                        stream_state["agent"] = "test_agent"
-
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(stream_response())
-
-                response_text = stream_state["text"]
-                agent_used = stream_state["agent"]
-
-                # Clear processing message and show simple response in chat
-                processing_placeholder.empty()
                 with st.chat_message("assistant"):
-                    st.write(f"Response from {agent_used} agent:")
-                    # Show a truncated preview
-                    preview = response_text[:200] + "..." if len(response_text) > 200 else response_text
-                    st.write(preview)
-                    if len(response_text) > 200:
-                        st.info("📋 Full response and audio available in tabs below")
-                    
-                    # Generate Summary for TTS and display
-                    summary_text = ""
+                    # Paint tokens as they arrive instead of buffering the
+                    # full response behind a processing placeholder
+                    st.write_stream(_stream_tokens(payload, stream_state))
+
+                    response_text = stream_state["text"]
+                    agent_used = stream_state["agent"]
+
+                    # Summarize (memoized by content hash) and launch TTS in
+                    # one coroutine; audio generates while the tabs render
+                    tts_task = None
                     if response_text and response_text.strip():
                         with st.spinner("📝 Generating summary..."):
-                            try:
-                                summary_text = loop.run_until_complete(
-                                    llm_service.summarize_text(response_text)
-                                )
-                                if not summary_text:
-                                    summary_text = response_text[:300] + "..."
-                            except Exception as sum_err:
-                                print(f"Summarization error: {sum_err}")
-                                summary_text = response_text[:300] + "..."
+                            summary_text, tts_task = run_async(
+                                _summarize_and_start_tts(response_text)
+                            )
                     else:
                         summary_text = "No response received."
 
-                    # TTS Logic - Generate audio for the summary
-                    audio_bytes = None
-                    tts_success = False
-
-                    # Generate audio for summary
-                    try:
-                        audio_bytes = loop.run_until_complete(
-                            voice_service.text_to_speech(summary_text)
-                        )
-                        tts_success = audio_bytes is not None and len(audio_bytes) >= 1000
-                    except Exception as tts_err:
-                        tts_success = False
-                        audio_bytes = None
-
                     # Check if avatar is active
                     avatar_active = bool(st.session_state.anam_session_token)
 
@@ -356,6 +876,14 @@ if st.session_state.session_id:
                     with tab_det:
                         st.write(response_text)
 
+                    # Collect the audio generated while the tabs rendered
+                    try:
+                        audio_bytes = run_async(_await_task(tts_task)) if tts_task else None
+                        tts_success = audio_bytes is not None and len(audio_bytes) >= 1000
+                    except Exception:
+                        tts_success = False
+                        audio_bytes = None
+
                     with tab_audio:
                         if audio_bytes and tts_success:
                             st.audio(audio_bytes, format="audio/mp3", autoplay=False)
@@ -375,10 +903,8 @@ if st.session_state.session_id:
                                 st.success("🎭 Avatar speaking summary")
 
                             # Show avatar embed
-                            avatar_html = anam_service.get_embed_html(
-                                session_token, 
-                                width=450, 
-                                height=320,
+                            avatar_html = embed_html_cached(
+                                session_token, 450, 320,
                                 speaking_text=summary_text
                             )
                             components.html(avatar_html, height=340)
@@ -387,240 +913,67 @@ if st.session_state.session_id:
                     avatar_indicator = " 🎭" if st.session_state.anam_session_token else ""
                     st.caption(f"🤖 Agent: {agent_used}{avatar_indicator}")
 
-                    # Add to history (including audio for replay)
+                    # Park the clip in the audio store and reference it by
+                    # id so the history entry itself stays small. IDs keep
+                    # counting up past evictions so they are never reused.
+                    audio_id = None
+                    if tts_success:
+                        audio_id = max(st.session_state.audio_store, default=-1) + 1
+                        st.session_state.audio_store[audio_id] = audio_bytes
+
+                    # Add to history (audio by reference for replay); render
+                    # the markdown blocks once now so replay reruns skip it
                     st.session_state.conversation_history.append({
                         "role": "assistant",
                         "content": response_text,
                         "agent": agent_used,
                         "summary": summary_text,
-                        "audio_bytes": audio_bytes if tts_success else None
+                        "rendered_summary_md": summary_text,
+                        "rendered_detail_md": response_text,
+                        "audio_id": audio_id,
                     })
 
+                    # Drop clips whose turns rolled off the bounded history
+                    # deque, or the store grows for the session's lifetime
+                    audio_store = st.session_state.audio_store
+                    if audio_store:
+                        live_ids = {
+                            msg.get("audio_id")
+                            for msg in st.session_state.conversation_history
+                        }
+                        for stale_id in [k for k in audio_store if k not in live_ids]:
+                            del audio_store[stale_id]
+
                     st.session_state.last_agent = agent_used
-                    
+
+                    # The backend writes a new Mem0 entry per turn; drop the
+                    # cached listing AND the service-level retrieval cache
+                    # underneath it, or the cleared fetch just re-reads an
+                    # entry that can be up to 60 s stale
+                    fetch_memories.clear()
+                    if settings.mem0_enabled:
+                        from services.tools_service import get_mem0_service
+
+                        get_mem0_service().invalidate(st.session_state.user_id)
+
             except Exception as e:
                 st.error(f"Error: {e}")
                 st.caption("Make sure the backend server is running: `uvicorn backend:app --port 8000 --reload`")
-        
-        # Legacy modes cleanup
-        if st.session_state.interaction_mode not in ["text", "voice"]:
-             st.session_state.interaction_mode = "text"
-             st.rerun()
     
     # -------- TAB 2: AGENT INFO --------
     with tab_agents:
         st.subheader("🤖 Available Specialized Agents")
-        
-        agents_info = {
-            "research": {
-                "icon": "🔍",
-                "description": "Web research, articles, and information gathering",
-                "tools": ["News search", "ChromaDB RAG", "Document retrieval"]
-            },
-            "finance": {
-                "icon": "💰",
-                "description": "Financial information, stocks, and investment advice",
-                "tools": ["Financial news", "Market data", "Investment guidance"]
-            },
-            "travel": {
-                "icon": "✈️",
-                "description": "Flights, hotels, and trip planning",
-                "tools": ["Flight search", "Hotel booking", "Travel guides"]
-            },
-            "shopping": {
-                "icon": "🛍️",
-                "description": "Product recommendations and shopping assistance",
-                "tools": ["Product search", "Price comparison", "Recommendations"]
-            },
-            "jobs": {
-                "icon": "💼",
-                "description": "Job search and career advice",
-                "tools": ["Google Jobs search", "Resume tips", "Career guidance"]
-            },
-            "recipes": {
-                "icon": "👨🍳",
-                "description": "Recipe discovery with ratings and ingredients",
-                "tools": ["Recipe search", "Ingredient lookup", "Cooking tips"]
-            }
-        }
-        
-        cols = st.columns(2)
-        for idx, (agent_name, info) in enumerate(agents_info.items()):
-            with cols[idx % 2]:
-                with st.container(border=True):
-                    st.markdown(f"### {info['icon']} {agent_name.title()}")
-                    st.write(info['description'])
-                    st.caption("Available tools:")
-                    for tool in info['tools']:
-                        st.caption(f"• {tool}")
-        
-        # Show last used agent
-        if st.session_state.last_agent:
-            st.divider()
-            st.info(f"Last agent used: **{st.session_state.last_agent}**")
+        render_agents_tab()
     
     # -------- TAB 3: MEMORY --------
     with tab_memory:
         st.subheader("🧠 User Memories")
-        
-        if settings.mem0_enabled:
-            # Retrieve user memories
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                memories = loop.run_until_complete(
-                    mem0_service.retrieve_memories(
-                        user_id=st.session_state.user_id,
-                        limit=10
-                    )
-                )
-                
-                if memories:
-                    st.write(f"📚 Found {len(memories)} memories:")
-                    for i, memory in enumerate(memories, 1):
-                        with st.expander(f"Memory {i}"):
-                            st.write(memory.get("message", ""))
-                            if "metadata" in memory:
-                                st.caption(f"Metadata: {memory['metadata']}")
-                else:
-                    st.info("No memories stored yet. Start chatting to create memories!")
-            
-            except Exception as e:
-                st.warning(f"Could not retrieve memories: {e}")
-        else:
-            st.info("💾 Mem0 integration not enabled. Enable in settings to use long-term memory.")
+        render_memory_tab()
 
     # -------- TAB 4: AVATAR --------
     with tab_avatar:
         st.subheader("🎥 AI Video Avatar")
-
-        # Check avatar configuration
-        is_configured = anam_service.is_configured()
-
-        if st.session_state.anam_session_token:
-            session = st.session_state.anam_session_token
-            is_demo = session.get("isDemo", False)
-
-            # Status header
-            if is_demo:
-                st.warning("🎭 Demo Mode - Configure ANAM_API_KEY for live video")
-            else:
-                st.success("🎭 Live Avatar Connected")
-
-            # Avatar info bar
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Name", session.get("personaName", "AI Assistant"))
-            with col2:
-                st.metric("Mode", "Demo" if is_demo else "Live")
-            with col3:
-                st.metric("Status", "🟢 Active")
-
-            st.markdown("---")
-
-            # Get session token
-            session_token = session.get("sessionToken", "demo-token")
-
-            # Test speak section
-            st.markdown("### Make Avatar Speak")
-            test_text = st.text_input("Enter text for avatar to speak:", value="Hello! I am your AI assistant.", key="test_avatar_text")
-            
-            # Get current speaking text from session state
-            current_speak_text = st.session_state.get("avatar_speak_text", "")
-            
-            if st.button("🎤 Speak Now", key="test_speak_avatar"):
-                st.session_state.avatar_speak_text = test_text
-                st.rerun()
-
-            # Show speaking status
-            if current_speak_text:
-                st.success(f"🗣️ Speaking: \"{current_speak_text[:80]}...\"" if len(current_speak_text) > 80 else f"🗣️ Speaking: \"{current_speak_text}\"")
-
-            st.markdown("---")
-
-            # Avatar video display - with speaking text if any
-            st.markdown("### Avatar Video")
-            avatar_html = anam_service.get_embed_html(
-                session_token, 
-                width=450, 
-                height=340,
-                speaking_text=current_speak_text
-            )
-            components.html(avatar_html, height=360)
-
-            # Clear speaking text after rendering
-            if current_speak_text:
-                st.session_state.avatar_speak_text = ""
-
-            # Controls
-            st.markdown("### Session Controls")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if st.button("🔄 Refresh Session", key="refresh_avatar_tab"):
-                    st.info("Refreshing avatar session...")
-                    st.rerun()
-
-            with col2:
-                if st.button("⏹️ End Session", key="stop_avatar_tab"):
-                    # End the session properly
-                    if not is_demo:
-                        try:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            loop.run_until_complete(
-                                anam_service.end_session(session.get("sessionId", ""))
-                            )
-                        except Exception:
-                            pass
-                    st.session_state.anam_session_token = None
-                    st.success("Avatar session ended!")
-                    st.rerun()
-
-        else:
-            # No active session - show start options
-            st.info("🤖 Start an avatar session to enable AI video interactions")
-
-            # Configuration status
-            if is_configured:
-                st.success("✅ Anam AI API configured")
-            else:
-                st.warning("⚠️ Anam AI not configured - Demo mode available")
-                st.caption("Add ANAM_API_KEY to your .env file for live video")
-
-            st.markdown("---")
-
-            # Avatar preview placeholder
-            preview_html = anam_service.get_embed_html("demo-preview", width=400, height=300)
-            components.html(preview_html, height=320)
-
-            st.markdown("---")
-
-            # Start button
-            if st.button("🎬 Start Avatar Session", key="start_avatar_tab", type="primary"):
-                with st.spinner("Initializing avatar..."):
-                    try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        session_data = loop.run_until_complete(
-                            anam_service.create_session_token(persona_name="AI Assistant")
-                        )
-
-                        if session_data:
-                            st.session_state.anam_session_token = session_data
-                            is_demo = session_data.get("isDemo", False)
-                            if is_demo:
-                                st.success("🎭 Demo avatar started!")
-                            else:
-                                st.success("🎭 Live avatar connected!")
-                            st.rerun()
-                        else:
-                            st.error("Failed to create avatar session")
-
-                    except Exception as e:
-                        st.error(f"Error starting avatar: {e}")
-                        st.info("💡 Check your ANAM_API_KEY configuration")
+        render_avatar_tab()
 
 else:
     st.info("👈 Please initialize a session from the sidebar to start.")
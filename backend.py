@@ -1,7 +1,16 @@
 import json
 import time
+from contextlib import asynccontextmanager
 from typing import List, Optional, Dict, Any
 
+# Everything below (LLM, Anam, Mem0, SerpApi) is I/O-bound on this loop;
+# libuv's C event loop shaves per-await overhead across all of it
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
@@ -10,7 +19,7 @@ from pydantic import BaseModel
 from services.llm_service import llm_service  # Cerebras only
 from services.supervisor_agent import supervisor_agent
 from services.specialized_agents import AGENT_REGISTRY
-from services.tools_service import mem0_service
+from services.tools_service import get_mem0_service
 from config.settings import settings  
 
 
@@ -47,10 +56,44 @@ class MultiModalRequest(BaseModel):
 # FastAPI App
 # -------------------------------
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm shared connections at startup; close pools at shutdown."""
+    # A throwaway models.list() puts a live TLS connection in the shared
+    # Groq pool, so the first user's query doesn't pay the handshake
+    try:
+        await llm_service.client.models.list()
+    except Exception as e:
+        print(f"LLM connection warmup failed: {e}")
+
+    yield
+
+    # Drain pending avatar teardowns and release pooled connections.
+    # Only close lazy services that were actually built — constructing
+    # one here just to close it can raise (missing env var) and abort
+    # the rest of the teardown — and isolate each close so one failure
+    # doesn't leak the remaining pools.
+    from services._openai_client import shared_httpx_client
+    from services.anam_service import anam_service
+    from services.tools_service import get_chromadb_service, get_serpapi_service
+
+    closers = [anam_service.aclose]
+    for accessor in (get_serpapi_service, get_chromadb_service):
+        if accessor.cache_info().currsize:
+            closers.append(accessor().aclose)
+    closers.append(shared_httpx_client.aclose)
+    for aclose in closers:
+        try:
+            await aclose()
+        except Exception as e:
+            print(f"Error closing service on shutdown: {e}")
+
+
 app = FastAPI(
     title="Multi-Agent AI Assistant Backend",
     description="FastAPI backend with supervisor agent orchestration for specialized domains",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -63,6 +106,25 @@ app.add_middleware(
 )
 
 
+# In-memory conversation history keyed by session_id so clients only need
+# to send the new message plus a session reference each turn.
+_session_histories: Dict[str, List[Dict[str, str]]] = {}
+
+
+def _history_for(payload: "MultiModalRequest") -> List[Dict[str, str]]:
+    """Resolve the conversation history for a request.
+
+    Prefers the append-only server-side store; only converts Message models
+    when a legacy client ships the full transcript itself.
+    """
+    if payload.conversation_history is not None:
+        return [
+            {"role": m.role, "content": m.content}
+            for m in payload.conversation_history
+        ]
+    return _session_histories.setdefault(payload.session_id, [])
+
+
 # -------------------------------
 # Health & Debug Endpoints
 # -------------------------------
@@ -98,10 +160,11 @@ async def create_session(body: SessionCreateRequest):
     """
     try:
         session_id = f"session-{body.user_id}"
+        _session_histories[session_id] = []
 
         # Initialize user in Mem0
         if settings.mem0_enabled:
-            await mem0_service.add_memory(
+            await get_mem0_service().add_memory(
                 user_id=body.user_id,
                 message=f"User {body.first_name} initialized.",
                 metadata={
@@ -134,7 +197,7 @@ async def route_message(payload: MultiModalRequest):
         # Get user's stored memories
         user_memories = None
         if settings.mem0_enabled:
-            memories = await mem0_service.retrieve_memories(
+            memories = await get_mem0_service().retrieve_memories(
                 user_id=payload.user_id,
                 limit=5
             )
@@ -147,10 +210,7 @@ async def route_message(payload: MultiModalRequest):
         routing_decision = await supervisor_agent.route(
             message=payload.message,
             user_id=payload.user_id,
-            conversation_history=[
-                {"role": m.role, "content": m.content}
-                for m in payload.conversation_history or []
-            ],
+            conversation_history=_history_for(payload),
             user_memories=user_memories,
         )
 
@@ -194,7 +254,7 @@ async def multi_agent_stream(payload: MultiModalRequest):
             # Step 1: Get user memories
             user_memories = None
             if settings.mem0_enabled:
-                memories = await mem0_service.retrieve_memories(
+                memories = await get_mem0_service().retrieve_memories(
                     user_id=payload.user_id,
                     limit=5
                 )
@@ -208,10 +268,7 @@ async def multi_agent_stream(payload: MultiModalRequest):
             routing_decision = await supervisor_agent.route(
                 message=payload.message,
                 user_id=payload.user_id,
-                conversation_history=[
-                    {"role": m.role, "content": m.content}
-                    for m in payload.conversation_history or []
-                ],
+                conversation_history=_history_for(payload),
                 user_memories=user_memories,
             )
 
@@ -242,10 +299,15 @@ async def multi_agent_stream(payload: MultiModalRequest):
 
             # Step 5: Save to memories
             print(f"\nSaving to memories...")
+
+            # Persist the turn server-side for the next request
+            session_history = _session_histories.setdefault(payload.session_id, [])
+            session_history.append({"role": "user", "content": payload.message})
+            session_history.append({"role": "assistant", "content": full_response})
             
             # Save to Mem0
             if settings.mem0_enabled:
-                await mem0_service.add_memory(
+                await get_mem0_service().add_memory(
                     user_id=payload.user_id,
                     message=f"Used {recommended_agent} agent: {payload.message[:100]}",
                     metadata={
@@ -1,6 +1,8 @@
 """Configuration settings for the Multi-Agent AI Assistant."""
+import sys
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Tuple
 
 
 class Settings(BaseSettings):
@@ -31,21 +33,38 @@ class Settings(BaseSettings):
     # ========================
     chromadb_collection_name: str = "documents"
     chromadb_persist_directory: str = "./data/chroma"
+    # "chroma" (persistent, HNSW) or "faiss" (in-memory exact search;
+    # faster per query for small corpora)
+    vector_backend: str = "chroma"
+    # Store FAISS vectors as int8 instead of float32: 4x less memory
+    # traffic per scan at a small recall cost
+    faiss_quantize_int8: bool = False
 
     # ========================
     # Agent Configuration
     # ========================
     primary_llm_model: str = "llama-3.1-8b-instant"  # Groq Reasoning Model
+    rag_model: str = "llama-3.1-8b-instant"  # Fast model for document Q&A
     
-    # Specialized agent domains
-    agent_domains: List[str] = [
+    # Specialized agent domains. Interned tuple: domain names are compared
+    # constantly on the routing path, and interning makes those checks
+    # pointer comparisons instead of character scans.
+    agent_domains: Tuple[str, ...] = tuple(sys.intern(domain) for domain in (
         "research",
         "finance",
         "travel",
         "shopping",
         "jobs",
-        "recipes"
-    ]
+        "recipes",
+    ))
+
+    # ========================
+    # Voice Configuration
+    # ========================
+    # Path to a Piper ONNX voice model (e.g. en_US-amy-medium.onnx).
+    # When set, TTS runs locally in-process instead of calling out to
+    # OpenAI or Google.
+    piper_voice_model: Optional[str] = None
 
     # ========================
     # Interaction Modes
@@ -54,7 +73,9 @@ class Settings(BaseSettings):
     enable_voice_agent: bool = True
     enable_video_avatar: bool = True # Anam AI avatar (requires ANAM_API_KEY)
 
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    # frozen=True: settings never change after startup, and an immutable
+    # model lets every importer share the instance without defensive copies
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
 
 # Global settings instance
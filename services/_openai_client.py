@@ -0,0 +1,21 @@
+"""Shared HTTP and LLM clients for the Groq OpenAI-compatible endpoint."""
+import httpx
+from openai import AsyncOpenAI
+
+from config.settings import settings
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# One keep-alive pool for every LLM call path: LLMService's AsyncOpenAI
+# and the supervisor's ChatOpenAI talk to the same host, so splitting
+# them across two pools just doubled the TLS handshake work.
+shared_httpx_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+)
+
+shared_openai_client = AsyncOpenAI(
+    base_url=GROQ_BASE_URL,
+    api_key=settings.groq_api,
+    http_client=shared_httpx_client,
+)
@@ -1,10 +1,178 @@
 """Anam AI service for avatar management and video interactions."""
+import asyncio
+import logging
+
 import httpx
-import json
+import orjson
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from config.settings import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _slug(name: str) -> str:
+    """Memoized persona-name slug used for demo token/session ids."""
+    return name.lower().replace(" ", "-")
+
+
+# Embed markup built once at import; get_embed_html only formats the few
+# varying fields into these instead of reassembling the multi-kilobyte
+# blobs per call. Literal CSS/JS braces are doubled for str.format.
+_DEMO_TEMPLATE = '''
+            <div style="
+                width: {width}px;
+                height: {height}px;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                border-radius: 12px;
+                display: flex;
+                flex-direction: column;
+                align-items: center;
+                justify-content: center;
+                color: white;
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            ">
+                <div style="font-size: 64px; margin-bottom: 16px; animation: pulse 2s infinite;">🤖</div>
+                <div style="font-size: 18px; font-weight: 600;">AI Avatar</div>
+                <div style="font-size: 14px; opacity: 0.8; margin-top: 8px;">Demo Mode Active</div>
+                <div style="font-size: 12px; opacity: 0.6; margin-top: 4px;">Configure ANAM_API_KEY for live video</div>
+                <style>
+                    @keyframes pulse {{
+                        0%, 100% {{ transform: scale(1); }}
+                        50% {{ transform: scale(1.1); }}
+                    }}
+                </style>
+            </div>
+            '''
+
+_REAL_TEMPLATE = '''
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+                body {{
+                    background: #0a0a0f;
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                    height: 100vh;
+                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                }}
+                .avatar-container {{
+                    width: {width}px;
+                    height: {height}px;
+                    border-radius: 12px;
+                    overflow: hidden;
+                    background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+                    position: relative;
+                }}
+                #persona-video {{
+                    width: 100%;
+                    height: 100%;
+                    object-fit: cover;
+                    border-radius: 12px;
+                }}
+                .loading-overlay {{
+                    position: absolute;
+                    top: 0;
+                    left: 0;
+                    right: 0;
+                    bottom: 0;
+                    display: flex;
+                    flex-direction: column;
+                    align-items: center;
+                    justify-content: center;
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    color: white;
+                    transition: opacity 0.5s ease;
+                }}
+                .loading-overlay.hidden {{ opacity: 0; pointer-events: none; }}
+                .spinner {{
+                    width: 40px;
+                    height: 40px;
+                    border: 3px solid rgba(255,255,255,0.3);
+                    border-top-color: white;
+                    border-radius: 50%;
+                    animation: spin 1s linear infinite;
+                    margin-bottom: 16px;
+                }}
+                @keyframes spin {{ to {{ transform: rotate(360deg); }} }}
+                .status {{ font-size: 14px; opacity: 0.9; }}
+                .error {{ color: #ff6b6b; font-size: 12px; margin-top: 8px; }}
+            </style>
+        </head>
+        <body>
+            <div class="avatar-container">
+                <video id="persona-video" autoplay playsinline></video>
+                <div id="loading-overlay" class="loading-overlay">
+                    <div class="spinner"></div>
+                    <div class="status" id="status-text">Connecting to avatar...</div>
+                    <div class="error" id="error-text"></div>
+                </div>
+            </div>
+
+            <script type="module">
+                import {{ createClient }} from "https://esm.sh/@anam-ai/js-sdk@latest";
+
+                const sessionToken = "{session_token}";
+                const speakingText = "{escaped_text}";
+
+                const statusText = document.getElementById('status-text');
+                const errorText = document.getElementById('error-text');
+                const loadingOverlay = document.getElementById('loading-overlay');
+
+                async function initAvatar() {{
+                    try {{
+                        statusText.textContent = 'Initializing avatar...';
+
+                        // Create the Anam client with session token
+                        const anamClient = createClient(sessionToken);
+
+                        statusText.textContent = 'Starting video stream...';
+
+                        // Stream to the video element
+                        await anamClient.streamToVideoElement('persona-video');
+
+                        // Hide loading overlay when video starts
+                        loadingOverlay.classList.add('hidden');
+
+                        // If we have text to speak, make the avatar say it
+                        if (speakingText && speakingText.trim()) {{
+                            // Small delay to ensure connection is stable
+                            setTimeout(async () => {{
+                                try {{
+                                    await anamClient.talk(speakingText);
+                                    console.log('Avatar speaking:', speakingText);
+                                }} catch (talkError) {{
+                                    console.error('Talk error:', talkError);
+                                }}
+                            }}, 1000);
+                        }}
+
+                        console.log('Avatar connected successfully');
+
+                    }} catch (error) {{
+                        console.error('Avatar initialization error:', error);
+                        statusText.textContent = 'Connection failed';
+                        errorText.textContent = error.message || 'Unable to connect';
+                    }}
+                }}
+
+                // Initialize when the page loads
+                initAvatar();
+            </script>
+        </body>
+        </html>
+        '''
+
+# Single C-level pass over the speaking text instead of a chain of
+# str.replace allocations
+_JS_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": " ", "\r": ""})
+
+
 class AnamService:
     """Service for interacting with Anam AI API for video avatar."""
 
@@ -14,11 +182,72 @@ class AnamService:
         self.base_url = settings.anam_api_base_url or "https://api.anam.ai"
         self.avatar_id = settings.anam_avatar_id
         self.voice_id = settings.anam_voice_id
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}" if self.api_key else "",
-            "Content-Type": "application/json",
-        }
+        # Only carry auth when a key exists; an empty "Bearer " header is
+        # an invalid credential, not a no-op. These become the shared
+        # client's defaults, so call sites never re-merge them.
+        self.headers = (
+            {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            }
+            if self.api_key
+            else {}
+        )
         self.enabled = bool(self.api_key)
+        self._client: Optional[httpx.AsyncClient] = None
+        # Background teardown tasks; held here so the event loop's weak
+        # references don't let them get garbage-collected mid-flight
+        self._pending: set = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared API client, creating it on first use.
+
+        One long-lived client keeps TLS connections to the Anam API warm
+        across calls instead of paying a fresh handshake per request.
+        Lazily built so importing the module never opens sockets.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(30.0),
+                # An explicit transport makes httpx ignore client-level
+                # http2/limits kwargs, so everything lives on the
+                # transport: connect retries keep transient network blips
+                # from unwinding to the caller, HTTP/2 multiplexes
+                # concurrent session/message calls on one stream
+                transport=httpx.AsyncHTTPTransport(
+                    retries=3,
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=20, max_keepalive_connections=10
+                    ),
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Drain in-flight teardowns and close the shared client."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post_with_backoff(self, url: str, **kwargs) -> httpx.Response:
+        """POST with a short exponential backoff on 429/503.
+
+        Rate-limit and brief-outage responses are retried twice before
+        the error surfaces, so transient Anam flakiness doesn't kick
+        callers into demo mode.
+        """
+        client = self._get_client()
+        for attempt in range(3):
+            response = await client.post(url, **kwargs)
+            if response.status_code in (429, 503) and attempt < 2:
+                await asyncio.sleep(0.25 * (2 ** attempt))
+                continue
+            response.raise_for_status()
+            return response
 
     def is_configured(self) -> bool:
         """Check if Anam AI is properly configured."""
@@ -80,25 +309,26 @@ class AnamService:
                 if max_session_length_seconds:
                     payload["personaConfig"]["maxSessionLengthSeconds"] = max_session_length_seconds
 
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        url, headers=self.headers, json=payload, timeout=30.0
-                    )
-                    response.raise_for_status()
-                    result = response.json()
+                response = await self._post_with_backoff(
+                    url,
+                    # Encode once with orjson rather than httpx's stdlib path
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                )
+                result = orjson.loads(response.content)
 
-                    # Add metadata for UI
-                    result["isDemo"] = False
-                    result["personaName"] = persona_name
-                    result["avatarId"] = avatar_id
-                    result["voiceId"] = voice_id
+                # Add metadata for UI
+                result["isDemo"] = False
+                result["personaName"] = persona_name
+                result["avatarId"] = avatar_id
+                result["voiceId"] = voice_id
 
-                    return result
+                return result
 
             except httpx.HTTPStatusError as e:
-                print(f"Anam API HTTP error: {e.response.status_code} - {e.response.text}")
+                logger.error("Anam API HTTP error: %s - %s", e.response.status_code, e.response.text)
             except Exception as e:
-                print(f"Anam API error: {e}")
+                logger.exception("Anam API error")
 
         # Fallback to demo session
         return self._create_demo_session(persona_name, avatar_id, voice_id)
@@ -110,10 +340,11 @@ class AnamService:
         voice_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Create a demo session when API is not available."""
+        slug = _slug(persona_name)
         return {
             "isDemo": True,
-            "sessionToken": f"demo-token-{persona_name.lower().replace(' ', '-')}",
-            "sessionId": f"demo-session-{persona_name.lower().replace(' ', '-')}",
+            "sessionToken": f"demo-token-{slug}",
+            "sessionId": f"demo-session-{slug}",
             "personaName": persona_name,
             "avatarId": avatar_id or "demo-avatar",
             "voiceId": voice_id or "demo-voice",
@@ -155,10 +386,10 @@ class AnamService:
         try:
             url = f"{self.base_url}/v1/sessions/{session_id or 'current'}/messages"
 
-            headers = {
-                **self.headers,
-                "X-Session-Token": session_token
-            }
+            # The shared client already carries auth/content-type defaults;
+            # only the per-session token needs sending here and httpx
+            # merges it without us allocating a combined dict
+            headers = {"X-Session-Token": session_token}
 
             payload = {
                 "message": message,
@@ -166,43 +397,63 @@ class AnamService:
                 "generateAudio": True
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, headers=headers, json=payload, timeout=60.0
-                )
-                response.raise_for_status()
-                return response.json()
+            headers["Content-Type"] = "application/json"
+            # Budget each phase separately: a hung connect fails in
+            # seconds instead of holding the caller for the full read
+            # window, and wait_for puts a hard ceiling over the retries
+            response = await asyncio.wait_for(
+                self._post_with_backoff(
+                    url,
+                    headers=headers,
+                    content=orjson.dumps(payload),
+                    timeout=httpx.Timeout(
+                        connect=3.0, read=60.0, write=10.0, pool=5.0
+                    ),
+                ),
+                timeout=65.0,
+            )
+            return orjson.loads(response.content)
 
+        except asyncio.TimeoutError:
+            logger.error("Avatar message timed out")
+            return None
         except Exception as e:
-            print(f"Error sending message to avatar: {e}")
+            logger.exception("Error sending message to avatar")
             return None
 
     async def end_session(self, session_id: str) -> bool:
         """
         End an avatar session.
 
+        The DELETE is fired in the background so callers don't wait a
+        network round-trip just to learn a session stopped; failures are
+        logged by the task itself.
+
         Args:
             session_id: The session ID to end
 
         Returns:
-            True if successful, False otherwise
+            True once the teardown has been scheduled
         """
         if not self.enabled or session_id.startswith("demo-"):
             return True
 
+        task = asyncio.create_task(self._delete_session(session_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+
+    async def _delete_session(self, session_id: str) -> None:
+        """Issue the session DELETE; runs detached from the caller."""
         try:
             url = f"{self.base_url}/v1/sessions/{session_id}"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    url, headers=self.headers, timeout=30.0
-                )
-                response.raise_for_status()
-                return True
+            client = self._get_client()
+            response = await client.delete(url, timeout=30.0)
+            response.raise_for_status()
 
         except Exception as e:
-            print(f"Error ending session: {e}")
-            return False
+            logger.exception("Error ending session")
 
     def get_embed_html(
         self, 
@@ -225,158 +476,18 @@ class AnamService:
         """
         if session_token.startswith("demo-"):
             # Demo mode - show animated placeholder with pulsing effect
-            return f'''
-            <div style="
-                width: {width}px; 
-                height: {height}px; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                border-radius: 12px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                color: white;
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            ">
-                <div style="font-size: 64px; margin-bottom: 16px; animation: pulse 2s infinite;">🤖</div>
-                <div style="font-size: 18px; font-weight: 600;">AI Avatar</div>
-                <div style="font-size: 14px; opacity: 0.8; margin-top: 8px;">Demo Mode Active</div>
-                <div style="font-size: 12px; opacity: 0.6; margin-top: 4px;">Configure ANAM_API_KEY for live video</div>
-                <style>
-                    @keyframes pulse {{
-                        0%, 100% {{ transform: scale(1); }}
-                        50% {{ transform: scale(1.1); }}
-                    }}
-                </style>
-            </div>
-            '''
+            return _DEMO_TEMPLATE.format_map({"width": width, "height": height})
 
         # Escape the speaking text for JavaScript
-        escaped_text = ""
-        if speaking_text:
-            escaped_text = speaking_text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ").replace("\r", "")
+        escaped_text = (speaking_text or "").translate(_JS_ESCAPE)
 
         # Real Anam AI embed using the official JS SDK
-        return f'''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                body {{ 
-                    background: #0a0a0f; 
-                    display: flex; 
-                    justify-content: center; 
-                    align-items: center;
-                    height: 100vh;
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                }}
-                .avatar-container {{
-                    width: {width}px;
-                    height: {height}px;
-                    border-radius: 12px;
-                    overflow: hidden;
-                    background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-                    position: relative;
-                }}
-                #persona-video {{
-                    width: 100%;
-                    height: 100%;
-                    object-fit: cover;
-                    border-radius: 12px;
-                }}
-                .loading-overlay {{
-                    position: absolute;
-                    top: 0;
-                    left: 0;
-                    right: 0;
-                    bottom: 0;
-                    display: flex;
-                    flex-direction: column;
-                    align-items: center;
-                    justify-content: center;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    transition: opacity 0.5s ease;
-                }}
-                .loading-overlay.hidden {{ opacity: 0; pointer-events: none; }}
-                .spinner {{
-                    width: 40px;
-                    height: 40px;
-                    border: 3px solid rgba(255,255,255,0.3);
-                    border-top-color: white;
-                    border-radius: 50%;
-                    animation: spin 1s linear infinite;
-                    margin-bottom: 16px;
-                }}
-                @keyframes spin {{ to {{ transform: rotate(360deg); }} }}
-                .status {{ font-size: 14px; opacity: 0.9; }}
-                .error {{ color: #ff6b6b; font-size: 12px; margin-top: 8px; }}
-            </style>
-        </head>
-        <body>
-            <div class="avatar-container">
-                <video id="persona-video" autoplay playsinline></video>
-                <div id="loading-overlay" class="loading-overlay">
-                    <div class="spinner"></div>
-                    <div class="status" id="status-text">Connecting to avatar...</div>
-                    <div class="error" id="error-text"></div>
-                </div>
-            </div>
-
-            <script type="module">
-                import {{ createClient }} from "https://esm.sh/@anam-ai/js-sdk@latest";
-                
-                const sessionToken = "{session_token}";
-                const speakingText = "{escaped_text}";
-                
-                const statusText = document.getElementById('status-text');
-                const errorText = document.getElementById('error-text');
-                const loadingOverlay = document.getElementById('loading-overlay');
-                
-                async function initAvatar() {{
-                    try {{
-                        statusText.textContent = 'Initializing avatar...';
-                        
-                        // Create the Anam client with session token
-                        const anamClient = createClient(sessionToken);
-                        
-                        statusText.textContent = 'Starting video stream...';
-                        
-                        // Stream to the video element
-                        await anamClient.streamToVideoElement('persona-video');
-                        
-                        // Hide loading overlay when video starts
-                        loadingOverlay.classList.add('hidden');
-                        
-                        // If we have text to speak, make the avatar say it
-                        if (speakingText && speakingText.trim()) {{
-                            // Small delay to ensure connection is stable
-                            setTimeout(async () => {{
-                                try {{
-                                    await anamClient.talk(speakingText);
-                                    console.log('Avatar speaking:', speakingText);
-                                }} catch (talkError) {{
-                                    console.error('Talk error:', talkError);
-                                }}
-                            }}, 1000);
-                        }}
-                        
-                        console.log('Avatar connected successfully');
-                        
-                    }} catch (error) {{
-                        console.error('Avatar initialization error:', error);
-                        statusText.textContent = 'Connection failed';
-                        errorText.textContent = error.message || 'Unable to connect';
-                    }}
-                }}
-                
-                // Initialize when the page loads
-                initAvatar();
-            </script>
-        </body>
-        </html>
-        '''
+        return _REAL_TEMPLATE.format_map({
+            "width": width,
+            "height": height,
+            "session_token": session_token,
+            "escaped_text": escaped_text,
+        })
 
 
 # Global service instance
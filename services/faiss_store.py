@@ -0,0 +1,125 @@
+"""FAISS-backed vector store: exact inner-product search for small corpora.
+
+For the multi-PDF RAG workload (well under 100K chunks) an in-memory
+``IndexFlatIP`` answers a query with a single BLAS matrix multiply —
+faster per query than ChromaDB's HNSW graph and with no index build
+cost. Selected over Chroma via ``settings.vector_backend = "faiss"``;
+the public surface mirrors ChromaDBService so callers don't care which
+backend is live.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import faiss
+    _FAISS_AVAILABLE = True
+except ImportError:
+    _FAISS_AVAILABLE = False
+
+from config.settings import settings
+from services.semantic_cache import EMBEDDINGS_AVAILABLE, encode_documents, encode_query
+
+logger = logging.getLogger(__name__)
+
+_EMBED_DIM = 384  # all-MiniLM-L6-v2 output width
+
+
+class FAISSVectorStore:
+    """Drop-in alternative to ChromaDBService for document storage and query."""
+
+    def __init__(self):
+        """Initialize the in-memory index; empty until documents are added."""
+        if not (_FAISS_AVAILABLE and EMBEDDINGS_AVAILABLE):
+            logger.warning("FAISS store disabled: faiss/sentence-transformers not installed")
+            self.index = None
+            self._records: List[Tuple[str, str, Dict[str, Any]]] = []
+            self._ids: set = set()
+            return
+        if settings.faiss_quantize_int8:
+            # Brute-force scan is memory-bound, so int8 storage is ~4x the
+            # throughput of float32; queries still rank by inner product
+            self.index = faiss.IndexScalarQuantizer(
+                _EMBED_DIM,
+                faiss.ScalarQuantizer.QT_8bit,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        else:
+            self.index = faiss.IndexFlatIP(_EMBED_DIM)
+        # (id, document, metadata) parallel to the index rows
+        self._records = []
+        self._ids = set()
+
+    async def add_documents(
+        self,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> bool:
+        """Add documents to the index."""
+        try:
+            if self.index is None or not documents:
+                return False
+
+            if not ids:
+                # Same content-hashed IDs as the Chroma backend
+                ids = [
+                    hashlib.blake2b(d.encode(), digest_size=12).hexdigest()
+                    for d in documents
+                ]
+            metadatas = metadatas or [{}] * len(documents)
+
+            # Skip IDs already indexed so re-ingest doesn't re-embed
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._ids]
+            if not keep:
+                return True
+            if len(keep) < len(documents):
+                documents = [documents[i] for i in keep]
+                metadatas = [metadatas[i] for i in keep]
+                ids = [ids[i] for i in keep]
+            self._ids.update(ids)
+
+            vecs = await asyncio.to_thread(encode_documents, documents)
+            if not self.index.is_trained:
+                # The scalar quantizer fits its per-dimension ranges on the
+                # first batch; a flat index is always trained so this no-ops
+                self.index.train(vecs[:10000])
+            self.index.add(vecs)
+            self._records.extend(zip(ids, documents, metadatas))
+            return True
+        except Exception as e:
+            logger.exception("Error adding documents")
+            return False
+
+    async def query_documents(
+        self,
+        query: str,
+        num_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Query documents; result shape matches ChromaDBService."""
+        try:
+            if self.index is None or not self.index.ntotal:
+                return []
+
+            query_vec = await asyncio.to_thread(encode_query, query)
+            scores, indices = self.index.search(
+                query_vec, min(num_results, self.index.ntotal)
+            )
+
+            formatted_results = []
+            for score, idx in zip(scores[0], indices[0]):
+                if idx < 0:
+                    continue
+                _, document, metadata = self._records[idx]
+                formatted_results.append({
+                    "document": document,
+                    # Chroma reports distance (lower = closer); convert the
+                    # cosine similarity so callers can rank either backend
+                    "distance": 1.0 - float(score),
+                    "metadata": metadata,
+                })
+            return formatted_results
+        except Exception as e:
+            logger.exception("Error querying documents")
+            return []
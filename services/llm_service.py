@@ -1,8 +1,11 @@
 """LLM service for Groq-powered LLM interactions."""
 import json
+import logging
 from typing import AsyncGenerator, List, Dict, Any, Optional, cast
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class LLMService:
     """Service for LLM interactions using Groq API."""
@@ -11,11 +14,8 @@ class LLMService:
         """Initialize LLM service with Groq."""
         if not settings.groq_api:
             raise ValueError("GROQ_API not configured")
-        from openai import AsyncOpenAI
-        self.client = AsyncOpenAI(
-            base_url="https://api.groq.com/openai/v1",
-            api_key=settings.groq_api
-        )
+        from services._openai_client import shared_openai_client
+        self.client = shared_openai_client
 
     async def stream_chat_completion(
         self,
@@ -23,9 +23,8 @@ class LLMService:
         system_prompt: str,
     ) -> AsyncGenerator[str, None]:
         """Stream chat completion from Groq LLM."""
-        # Prepend system message
-        openai_messages = [{"role": "system", "content": system_prompt}]
-        openai_messages.extend(messages)
+        # Prepend system message in one construction
+        openai_messages = [{"role": "system", "content": system_prompt}, *messages]
 
         try:
             # Stream response
@@ -37,12 +36,17 @@ class LLMService:
                 max_tokens=2048,
             )
 
+            # Deref the attribute chain once per chunk; at Groq token
+            # rates the repeated lookups add up in this loop
             async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+                choices = chunk.choices
+                delta = choices[0].delta if choices else None
+                content = delta.content if delta else None
+                if content:
+                    yield content
         except Exception as e:
             # If streaming fails, try non-streaming
-            print(f"\nStreaming failed, using non-streaming mode: {e}")
+            logger.warning("Streaming failed, using non-streaming mode: %s", e)
             response = await self.client.chat.completions.create(
                 model=settings.primary_llm_model,
                 messages=cast(Any, openai_messages),
@@ -67,11 +71,11 @@ class LLMService:
             A summarized version of the text suitable for audio playback
         """
         if not text or not text.strip():
-            print("[Summarize] No text provided")
+            logger.info("[Summarize] No text provided")
             return ""
             
         if not settings.groq_api:
-            print("[Summarize] GROQ_API not configured")
+            logger.warning("[Summarize] GROQ_API not configured")
             return text[:300] + "..."
         
         # Clean the input text
@@ -93,7 +97,7 @@ Text to summarize:
 Concise spoken summary:"""
 
         try:
-            print(f"[Summarize] Processing text of {len(clean_text)} chars...")
+            logger.debug("[Summarize] Processing text of %d chars", len(clean_text))
             
             response = await self.client.chat.completions.create(
                 model=settings.primary_llm_model,
@@ -115,16 +119,14 @@ Concise spoken summary:"""
             content = response.choices[0].message.content
             if content and content.strip():
                 summary = content.strip()
-                print(f"[Summarize] Generated summary of {len(summary)} chars")
+                logger.debug("[Summarize] Generated summary of %d chars", len(summary))
                 return summary
             
-            print("[Summarize] Empty response from LLM")
+            logger.warning("[Summarize] Empty response from LLM")
             return text[:300] + "..."
             
         except Exception as e:
-            print(f"[Summarize] Error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[Summarize] Error")
             return text[:300] + "..."
 
 # Global service instance
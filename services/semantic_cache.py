@@ -0,0 +1,108 @@
+"""Semantic query cache: serve paraphrased repeat queries from memory.
+
+Exact-match caches miss paraphrases ("cheap flights to LA" vs "affordable
+LAX tickets"). This cache embeds each query with MiniLM and returns a
+prior result when the cosine similarity to a cached query clears a
+threshold. sentence-transformers and faiss are optional; without them the
+cache is a no-op and callers fall through to the network.
+"""
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+
+try:
+    import faiss
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    _SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    _SEMANTIC_CACHE_AVAILABLE = False
+
+EMBEDDINGS_AVAILABLE = _SEMANTIC_CACHE_AVAILABLE
+
+_EMBED_DIM = 384  # all-MiniLM-L6-v2 output width
+
+# Loaded on first use so importing this module stays cheap
+_model = None
+
+
+def _get_model() -> "SentenceTransformer":
+    global _model
+    if _model is None:
+        _model = SentenceTransformer("all-MiniLM-L6-v2")
+    return _model
+
+
+def encode_query(query: str) -> "np.ndarray":
+    """Embed a query to a normalized float32 row vector."""
+    vec = _get_model().encode(query, normalize_embeddings=True)
+    return np.asarray(vec, dtype="float32").reshape(1, -1)
+
+
+def encode_documents(texts: List[str], batch_size: int = 64) -> "np.ndarray":
+    """Embed many texts in one vectorized pass; rows are normalized float32.
+
+    One call amortizes the transformer forward-pass overhead that
+    per-document encoding would pay len(texts) times over.
+    """
+    vecs = _get_model().encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        normalize_embeddings=True,
+    )
+    return np.asarray(vecs, dtype="float32")
+
+
+class SemanticCache:
+    """Cosine-similarity cache over normalized MiniLM query embeddings.
+
+    Usage: ``value, vec = await cache.lookup(query)``; on a miss do the
+    real work, then ``cache.store(vec, value)``. The vector is returned
+    from lookup so the query is only embedded once per call.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl: float = 300.0,
+    ):
+        self.enabled = _SEMANTIC_CACHE_AVAILABLE
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if self.enabled:
+            # Exact inner product == cosine since every vector is normalized
+            self._index = faiss.IndexFlatIP(_EMBED_DIM)
+            # (expires_at, value) parallel to the index rows
+            self._entries: List[Tuple[float, Any]] = []
+
+    async def lookup(self, query: str) -> Tuple[Optional[Any], Optional[Any]]:
+        """Return (cached value or None, query embedding for store())."""
+        if not self.enabled:
+            return None, None
+        # Encoding is CPU-bound (~ms); keep it off the event loop
+        vec = await asyncio.to_thread(encode_query, query)
+        if self._index.ntotal:
+            scores, indices = self._index.search(vec, 1)
+            if scores[0][0] >= self.threshold:
+                expires_at, value = self._entries[indices[0][0]]
+                if time.monotonic() < expires_at:
+                    return value, vec
+        return None, vec
+
+    def store(self, vec: Optional[Any], value: Any) -> None:
+        """Cache value under the embedding lookup() produced for its query."""
+        if not self.enabled or vec is None:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Flat indexes have no cheap removal; drop the older half and
+            # rebuild from the vectors we keep
+            keep = self.max_entries // 2
+            kept = self._index.reconstruct_n(self._index.ntotal - keep, keep)
+            self._index.reset()
+            self._index.add(kept)
+            self._entries = self._entries[-keep:]
+        self._index.add(vec)
+        self._entries.append((time.monotonic() + self.ttl, value))
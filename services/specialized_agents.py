@@ -5,7 +5,11 @@ import json
 
 from langchain_core.messages import HumanMessage
 from config.settings import settings
-from services.tools_service import serpapi_service, mem0_service, chromadb_service
+from services.tools_service import (
+    get_mem0_service,
+    get_serpapi_service,
+    get_vector_store,
+)
 
 
 class BaseSpecializedAgent(ABC):
@@ -38,7 +42,7 @@ class BaseSpecializedAgent(ABC):
 
     async def _get_user_context(self, user_id: str) -> Dict[str, Any]:
         """Get user context including memories."""
-        memories = await mem0_service.retrieve_memories(user_id)
+        memories = await get_mem0_service().retrieve_memories(user_id)
         return {
             "user_id": user_id,
             "memories": memories,
@@ -64,10 +68,10 @@ class ResearchAgent(BaseSpecializedAgent):
         context = await self._get_user_context(user_id)
         
         # Search news for current information
-        news_results = await serpapi_service.search_news(message, num_results=3)
+        news_results = await get_serpapi_service().search_news(message, num_results=3)
         
         # Query ChromaDB for document context
-        doc_results = await chromadb_service.query_documents(message)
+        doc_results = await get_vector_store().query_documents(message)
         
         # Build prompt with context
         context_str = "Recent News Results:\n"
@@ -102,7 +106,7 @@ class ResearchAgent(BaseSpecializedAgent):
         yield response.content
         
         # Save to memory if useful
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Researched: {message[:100]}",
             metadata={"domain": "research", "query": message}
@@ -127,7 +131,7 @@ class FinanceAgent(BaseSpecializedAgent):
         context = await self._get_user_context(user_id)
         
         # Search for financial news
-        financial_info = await serpapi_service.search_news(
+        financial_info = await get_serpapi_service().search_news(
             f"{message} financial news",
             num_results=5
         )
@@ -148,7 +152,7 @@ class FinanceAgent(BaseSpecializedAgent):
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         yield response.content
         
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Financial Query: {message[:100]}",
             metadata={"domain": "finance", "query": message}
@@ -189,7 +193,7 @@ class TravelAgent(BaseSpecializedAgent):
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         yield response.content
         
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Travel Interest: {message[:100]}",
             metadata={"domain": "travel", "query": message}
@@ -214,7 +218,7 @@ class ShoppingAgent(BaseSpecializedAgent):
         context = await self._get_user_context(user_id)
         
         # Search for products
-        search_results = await serpapi_service.search_news(
+        search_results = await get_serpapi_service().search_news(
             f"{message} products reviews",
             num_results=5
         )
@@ -235,7 +239,7 @@ class ShoppingAgent(BaseSpecializedAgent):
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         yield response.content
         
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Shopping Interest: {message[:100]}",
             metadata={"domain": "shopping", "query": message}
@@ -262,7 +266,7 @@ class JobsAgent(BaseSpecializedAgent):
         # Parse job search query (simplified)
         # In real implementation, would extract job title, location, etc.
         
-        jobs = await serpapi_service.search_jobs(message, num_results=5)
+        jobs = await get_serpapi_service().search_jobs(message, num_results=5)
         
         prompt = f"""
         You are a **Career & Talent Acquisition Specialist**.
@@ -287,7 +291,7 @@ class JobsAgent(BaseSpecializedAgent):
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         yield response.content
         
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Job Search: {message[:100]}",
             metadata={"domain": "jobs", "query": message}
@@ -312,7 +316,7 @@ class RecipesAgent(BaseSpecializedAgent):
         context = await self._get_user_context(user_id)
         
         # Search for recipes
-        recipes = await serpapi_service.search_recipes(message, num_results=5)
+        recipes = await get_serpapi_service().search_recipes(message, num_results=5)
         
         prompt = f"""
         You are a culinary expert and recipe guide.
@@ -335,7 +339,7 @@ class RecipesAgent(BaseSpecializedAgent):
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         yield response.content
         
-        await mem0_service.add_memory(
+        await get_mem0_service().add_memory(
             user_id=user_id,
             message=f"Recipe Interest: {message[:100]}",
             metadata={"domain": "recipes", "query": message}
@@ -1,13 +1,13 @@
-"""Supervisor Agent using LangGraph for intelligent routing to specialized agents."""
+"""Supervisor Agent for intelligent routing to specialized agents."""
 from typing import Annotated, Any, Dict, List, Optional, TypedDict
+from collections import OrderedDict
 from enum import Enum
 import asyncio
 import json
+import re
 
-from langchain_core.messages import AnyMessage, BaseMessage, HumanMessage
+from langchain_core.messages import AnyMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
-from langgraph.graph import END, StateGraph
-# from langgraph.prebuilt.tool_executor import ToolExecutor
 from pydantic import BaseModel, Field
 
 from config.settings import settings
@@ -23,6 +23,38 @@ class AgentDomain(str, Enum):
     RECIPES = "recipes"
 
 
+# Keyword fast path for the classifier: unambiguous vocabulary per domain,
+# scanned at C level before paying an LLM round-trip. research stays the
+# fallback, so it needs no pattern of its own.
+_DOMAIN_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "finance": re.compile(
+        r"\b(stocks?|ticker|nasdaq|nyse|portfolio|market\s*cap|dividends?|"
+        r"earnings|invest(?:ing|ment)?|crypto(?:currency)?|exchange\s*rate)\b",
+        re.I,
+    ),
+    "travel": re.compile(
+        r"\b(flights?|hotels?|itinerar(?:y|ies)|trip|vacation|"
+        r"tourist|destination|airfare|booking)\b",
+        re.I,
+    ),
+    "shopping": re.compile(
+        r"\b(buy|purchase|products?|price\s*comparison|deals?|discount|"
+        r"gift\s*ideas?|reviews?\s+for)\b",
+        re.I,
+    ),
+    "jobs": re.compile(
+        r"\b(jobs?|career|resume|cv|interview|hiring|salar(?:y|ies)|"
+        r"vacanc(?:y|ies)|recruiter)\b",
+        re.I,
+    ),
+    "recipes": re.compile(
+        r"\b(recipes?|cook(?:ing)?|ingredients?|bake|baking|meal\s*plan|"
+        r"dinner\s*ideas?|dish)\b",
+        re.I,
+    ),
+}
+
+
 class AgentState(TypedDict):
     """State for the supervisor agent graph."""
     messages: Annotated[List[AnyMessage], lambda x, y: x + y]
@@ -36,67 +68,73 @@ class AgentState(TypedDict):
 class SupervisorAgent:
     """
     Supervisor agent that routes requests to specialized domain agents.
-    
-    Uses LangGraph for orchestration and provides intelligent routing based on:
+
+    Provides intelligent routing based on:
     - Query context analysis
     - User intent detection
     - Domain classification
     - Tool availability
     """
 
+    # Cap on remembered classifier decisions
+    _EXACT_CACHE_MAX = 1024
+
+    # Compact, static classifier instruction. Sent as the system message
+    # with the raw query as the human turn, so providers see a stable
+    # prefix (prompt-cache friendly) and ~40 tokens instead of ~300 of
+    # prose per route.
+    _CLASSIFIER_PREFIX = (
+        "Classify the query into one domain: "
+        "research|finance|travel|shopping|jobs|recipes. "
+        "finance=stocks/tickers/market data/investing. "
+        "travel=flights/hotels/trips. shopping=products/buying. "
+        "jobs=careers/resumes. recipes=food/cooking. "
+        "General knowledge, news or company history=research. "
+        "If ambiguous, research. Reply with one lowercase word."
+    )
+
     def __init__(self):
         """Initialize supervisor agent with routing logic."""
         self.domains = [domain.value for domain in AgentDomain]
         self.llm = self._init_llm()
-        self.graph = self._build_routing_graph()
+        # Classifier decisions keyed by the normalized query (LRU, capped);
+        # repeat questions skip the LLM round-trip entirely
+        self._exact_cache: "OrderedDict[str, str]" = OrderedDict()
+        # Counters for tuning _DOMAIN_PATTERNS coverage
+        self._pattern_hits = 0
+        self._llm_classifications = 0
+        # Pending classifier calls keyed like _exact_cache; simultaneous
+        # duplicate queries share one LLM round-trip
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
 
     def _init_llm(self):
         """Initialize the primary LLM for routing decisions."""
         from langchain_openai import ChatOpenAI
-        
+
+        from services._openai_client import GROQ_BASE_URL, shared_httpx_client
+
         return ChatOpenAI(
             model=settings.primary_llm_model,
             api_key=settings.groq_api,
-            base_url="https://api.groq.com/openai/v1",
+            base_url=GROQ_BASE_URL,
             temperature=0.3,  # Lower temp for routing decisions
+            # Ride the same connection pool as LLMService
+            http_async_client=shared_httpx_client,
         )
 
-    def _build_routing_graph(self):
-        """Build LangGraph for agent routing."""
-        workflow = StateGraph(AgentState)
-
-        # Add nodes
-        workflow.add_node("classifier", self._classify_domain)
-        workflow.add_node("research_agent", self._route_to_research)
-        workflow.add_node("finance_agent", self._route_to_finance)
-        workflow.add_node("travel_agent", self._route_to_travel)
-        workflow.add_node("shopping_agent", self._route_to_shopping)
-        workflow.add_node("jobs_agent", self._route_to_jobs)
-        workflow.add_node("recipes_agent", self._route_to_recipes)
-
-        # Define routing logic
-        def get_next_node(state: AgentState) -> str:
-            domain = state.get("next_agent", "research")
-            return f"{domain}_agent"
-
-        # Add conditional edges
-        workflow.add_conditional_edges(
-            "classifier",
-            get_next_node,
-            {
-                "research_agent": "research_agent",
-                "finance_agent": "finance_agent",
-                "travel_agent": "travel_agent",
-                "shopping_agent": "shopping_agent",
-                "jobs_agent": "jobs_agent",
-                "recipes_agent": "recipes_agent",
-            }
-        )
-        
-        # Set entry point
-        workflow.set_entry_point("classifier")
-
-        return workflow.compile()
+    def _match_domain(self, message: str) -> Optional[str]:
+        """Rule-based classification; None when no domain wins outright."""
+        scores = {
+            domain: len(pattern.findall(message))
+            for domain, pattern in _DOMAIN_PATTERNS.items()
+        }
+        best = max(scores, key=scores.get)
+        top_score = scores[best]
+        # Only trust the rules when exactly one domain leads; ties and
+        # keyword-free queries go to the LLM
+        if top_score >= 1 and list(scores.values()).count(top_score) == 1:
+            return best
+        return None
 
     async def _classify_domain(self, state: AgentState) -> Dict[str, Any]:
         """
@@ -105,104 +143,77 @@ class SupervisorAgent:
         messages = state.get("messages", [])
         last_message = messages[-1].content if messages else ""
 
-        classification_prompt = f"""
-        You are the Supervisor Agent responsible for routing user queries to the most appropriate specialized agent.
-        
-        Analyze the user query and classify it into PREDISELY one of these domains:
-        {', '.join(self.domains)}
-
-        DOMAIN DEFINITIONS:
-        - research: General knowledge, company history, "who is", "what is", news summaries, academic topics, technology explanations. Use this for questions about companies that are NOT specifically about stock metrics.
-        - finance: Stock prices, ticker symbols, market cap, investment advice, portfolio management, currency exchange, financial reports.
-        - travel: Trip planning, flights, hotels, tourist attractions, destination guides.
-        - shopping: Product recommendations, reviews, buying advice, e-commerce, gifts.
-        - jobs: Career advice, resume writing, job search, interview prep.
-        - recipes: Cooking instructions, food ingredients, meal planning, dietary advice.
-
-        GUIDELINES:
-        - "Top stocks" or "stock price" -> finance
-        - "Top tech companies" (general) -> research
-        - "History of Apple" -> research
-        - "Apple stock analysis" -> finance
-        - If the query is ambiguous or falls between categories, prioritize 'research'.
-
-        User Query: {last_message}
-
-        Respond with ONLY the domain name (one word, lowercase). Do not add punctuation or explanation.
-        """
-
-        response = await self.llm.ainvoke([HumanMessage(content=classification_prompt)])
-        domain = response.content.strip().lower()
-
-        # Validate domain
-        if domain not in self.domains:
-            domain = "research"  # Default fallback
-
-        return {
-            "next_agent": domain,
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "classified_domain": domain,
-            }
-        }
-
-    async def _route_to_research(self, state: AgentState) -> Dict[str, Any]:
-        """Route to research agent."""
-        return {
-            "next_agent": "research_agent",
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "agent": "research"
-            }
-        }
-
-    async def _route_to_finance(self, state: AgentState) -> Dict[str, Any]:
-        """Route to finance agent."""
-        return {
-            "next_agent": "finance_agent",
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "agent": "finance"
+        # Exact-match cache first: identical (whitespace/case-normalized)
+        # queries route the same way, so don't bill tokens twice for them
+        cache_key = " ".join(last_message.lower().split())
+        cached_domain = self._exact_cache.get(cache_key)
+        if cached_domain is not None:
+            self._exact_cache.move_to_end(cache_key)
+            return {
+                "next_agent": cached_domain,
+                "conversation_context": {
+                    **state.get("conversation_context", {}),
+                    "classified_domain": cached_domain,
+                    "agent": cached_domain,
+                }
             }
-        }
 
-    async def _route_to_travel(self, state: AgentState) -> Dict[str, Any]:
-        """Route to travel agent."""
-        return {
-            "next_agent": "travel_agent",
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "agent": "travel"
+        # Keyword fast path: common queries ("flight to Paris", "recipe
+        # for ...") classify in microseconds with zero tokens billed
+        matched = self._match_domain(last_message)
+        if matched is not None:
+            self._pattern_hits += 1
+            self._exact_cache[cache_key] = matched
+            if len(self._exact_cache) > self._EXACT_CACHE_MAX:
+                self._exact_cache.popitem(last=False)
+            return {
+                "next_agent": matched,
+                "conversation_context": {
+                    **state.get("conversation_context", {}),
+                    "classified_domain": matched,
+                    "agent": matched,
+                }
             }
-        }
 
-    async def _route_to_shopping(self, state: AgentState) -> Dict[str, Any]:
-        """Route to shopping agent."""
-        return {
-            "next_agent": "shopping_agent",
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "agent": "shopping"
-            }
-        }
-
-    async def _route_to_jobs(self, state: AgentState) -> Dict[str, Any]:
-        """Route to jobs agent."""
-        return {
-            "next_agent": "jobs_agent",
-            "conversation_context": {
-                **state.get("conversation_context", {}),
-                "agent": "jobs"
-            }
-        }
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            # Another task is already classifying this exact query under a
+            # burst; piggyback on its result instead of re-asking the LLM
+            domain = await pending
+        else:
+            future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            try:
+                self._llm_classifications += 1
+                response = await self.llm.ainvoke([
+                    SystemMessage(content=self._CLASSIFIER_PREFIX),
+                    HumanMessage(content=last_message),
+                ])
+                domain = response.content.strip().lower()
+
+                # Validate domain
+                if domain not in self.domains:
+                    domain = "research"  # Default fallback
+            except Exception as e:
+                future.set_exception(e)
+                # Mark retrieved for the no-waiters case before re-raising
+                future.exception()
+                raise
+            else:
+                future.set_result(domain)
+            finally:
+                del self._inflight[cache_key]
+
+            self._exact_cache[cache_key] = domain
+            if len(self._exact_cache) > self._EXACT_CACHE_MAX:
+                self._exact_cache.popitem(last=False)
 
-    async def _route_to_recipes(self, state: AgentState) -> Dict[str, Any]:
-        """Route to recipes agent."""
         return {
-            "next_agent": "recipes_agent",
+            "next_agent": domain,
             "conversation_context": {
                 **state.get("conversation_context", {}),
-                "agent": "recipes"
+                "classified_domain": domain,
+                "agent": domain,
             }
         }
 
@@ -225,18 +236,11 @@ class SupervisorAgent:
         Returns:
             Routing decision with recommended agent and context
         """
-        # Build initial state
-        messages = [HumanMessage(content=message)]
-        if conversation_history:
-            for msg in conversation_history:
-                if msg["role"] == "user":
-                    messages.append(HumanMessage(content=msg["content"]))
-                else:
-                    from langchain_core.messages import AIMessage
-                    messages.append(AIMessage(content=msg["content"]))
-
+        # Build initial state. Classification only ever looks at the new
+        # message, so don't burn O(history) Pydantic message construction
+        # on a path that never reads it.
         state: AgentState = {
-            "messages": messages,
+            "messages": [HumanMessage(content=message)],
             "next_agent": None,
             "last_message": message,
             "conversation_context": {},
@@ -244,13 +248,16 @@ class SupervisorAgent:
             "user_memories": user_memories,
         }
 
-        # Invoke routing graph
-        output = await self.graph.ainvoke(state)
+        # The routing "graph" collapsed to a single classifier step, so
+        # call it directly instead of paying LangGraph's executor, channel
+        # writes and state reducers per query
+        output = await self._classify_domain(state)
 
+        context = output.get("conversation_context", {})
         return {
-            "recommended_agent": output.get("conversation_context", {}).get("agent", "research"),
-            "classified_domain": output.get("conversation_context", {}).get("classified_domain"),
-            "context": output.get("conversation_context", {}),
+            "recommended_agent": context.get("agent", "research"),
+            "classified_domain": context.get("classified_domain"),
+            "context": context,
             "user_id": user_id,
         }
 
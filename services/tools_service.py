@@ -1,7 +1,53 @@
 """Tool integrations: SerpApi, Mem0, ChromaDB for specialized agents."""
-from typing import Dict, List, Any, Optional
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+import chromadb
+import httpx
+from groq import AsyncGroq
+from mem0 import MemoryClient
 
 from config.settings import settings
+from services.semantic_cache import (
+    EMBEDDINGS_AVAILABLE,
+    SemanticCache,
+    encode_documents,
+    encode_query,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Result-list key in the SerpApi response per engine, mirroring what the
+# individual search methods extract
+_ENGINE_RESULT_KEYS = {
+    "news": "news_results",
+    "google_flights": "flights",
+    "google_hotels": "hotels",
+    "google_jobs": "jobs_results",
+    "recipes": "local_results",
+}
+
+# Result-cache TTLs per engine: news goes stale quickly, flight/hotel
+# inventory holds for minutes. SerpApi bills per call, so repeat queries
+# inside these windows should never reach the network.
+_RESULT_TTLS = {
+    "news": 60.0,
+    "google_flights": 600.0,
+    "google_hotels": 600.0,
+}
+_DEFAULT_RESULT_TTL = 300.0
+_RESULT_CACHE_MAX = 1024
+
+# Memories rarely change between adjacent turns; cache lookups briefly
+_MEM0_RESULT_TTL = 60.0
+_MEM0_CACHE_MAX = 256
 
 
 class SerpApiService:
@@ -13,24 +59,158 @@ class SerpApiService:
             raise ValueError("SERPAPI_KEY not configured")
         self.api_key = settings.serpapi_key
         self.base_url = "https://serpapi.com"
+        # One pooled client for every search method; per-call clients paid
+        # a fresh TCP+TLS handshake to serpapi.com on each lookup
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            # Flights/hotels/jobs payloads are large JSON and compress
+            # 60-80%; advertise gzip/brotli and multiplex concurrent
+            # lookups over one HTTP/2 connection
+            http2=True,
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, br",
+            },
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        # (engine, sorted params) -> (expiry, results); LRU-evicted at cap
+        self._result_cache: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Paraphrase-tolerant caches for the free-text engines; TTLs match
+        # the exact cache above
+        self._news_cache = SemanticCache(ttl=_RESULT_TTLS["news"])
+        self._recipes_cache = SemanticCache(ttl=_DEFAULT_RESULT_TTL)
+
+    async def aclose(self) -> None:
+        """Close the pooled client; wire into app shutdown."""
+        await self._client.aclose()
+
+    @staticmethod
+    def _cache_key(engine: str, params: Dict[str, Any]) -> Tuple:
+        """Stable cache key; the api_key never varies so it is excluded."""
+        return (
+            engine,
+            tuple(sorted((k, v) for k, v in params.items() if k != "api_key")),
+        )
+
+    def _cached_results(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return unexpired cached results for key, or None."""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if time.monotonic() >= expires_at:
+            del self._result_cache[key]
+            return None
+        self._result_cache.move_to_end(key)
+        return results
+
+    def _store_results(self, engine: str, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        """Cache results under the engine's TTL, evicting the LRU entry at cap."""
+        ttl = _RESULT_TTLS.get(engine, _DEFAULT_RESULT_TTL)
+        self._result_cache[key] = (time.monotonic() + ttl, results)
+        if len(self._result_cache) > _RESULT_CACHE_MAX:
+            self._result_cache.popitem(last=False)
+
+    async def _get_with_backoff(self, params: Dict[str, Any]) -> httpx.Response:
+        """GET /search, retrying transport errors and 429/503 with backoff."""
+        for attempt in range(3):
+            try:
+                response = await self._client.get("/search", params=params)
+            except httpx.TransportError:
+                if attempt == 2:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            if response.status_code in (429, 503) and attempt < 2:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            response.raise_for_status()
+            return response
+
+    async def _get_results(
+        self,
+        engine: str,
+        params: Dict[str, Any],
+        semantic_cache: Optional[SemanticCache] = None,
+        query: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Shared fetch path for every search method.
+
+        Checks the exact cache, then the engine's semantic cache when one
+        is given, then hits the network with retries. Failures log a
+        warning and return [], preserving the empty-list contract callers
+        already rely on.
+        """
+        cache_key = self._cache_key(engine, params)
+        cached = self._cached_results(cache_key)
+        if cached is not None:
+            return cached
+
+        query_vec = None
+        if semantic_cache is not None and query is not None:
+            semantic_hit, query_vec = await semantic_cache.lookup(query)
+            if semantic_hit is not None:
+                return semantic_hit
+
+        try:
+            response = await self._get_with_backoff(params)
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("SerpApi %s search failed: %s", engine, e)
+            return []
+
+        results = data.get(_ENGINE_RESULT_KEYS.get(engine, "organic_results"), [])
+        self._store_results(engine, cache_key, results)
+        if semantic_cache is not None:
+            semantic_cache.store(query_vec, results)
+        return results
+
+    async def batch_search(self, specs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Run several SerpApi lookups concurrently.
+
+        Each spec is ``{"engine": <name>, "params": {...}}`` with engine
+        one of the keys in _ENGINE_RESULT_KEYS; the API key and engine
+        selector are filled in automatically. All requests fan out over
+        the shared pooled client, so total latency is the slowest single
+        lookup rather than the sum. Results come back in spec order and
+        a failed lookup yields [] like the individual methods do.
+        """
+        async def _one(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+            engine = spec.get("engine", "")
+            params = {"api_key": self.api_key, **spec.get("params", {})}
+            if engine.startswith("google_"):
+                params.setdefault("engine", engine)
+            elif engine == "news":
+                params.setdefault("tbm", "nws")
+            elif engine == "recipes":
+                params.setdefault("tbm", "lcl")
+            return await self._get_results(engine, params)
+
+        results = await asyncio.gather(
+            *(_one(spec) for spec in specs), return_exceptions=True
+        )
+
+        batched: List[List[Dict[str, Any]]] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Error in batched search: %s", result)
+                batched.append([])
+            else:
+                batched.append(result)
+        return batched
 
     async def search_news(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """Search for news articles."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": query,
-                "tbm": "nws",
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("news_results", [])
-            except Exception as e:
-                print(f"Error searching news: {e}")
-                return []
+        params = {
+            "q": query,
+            "tbm": "nws",
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        return await self._get_results(
+            "news", params, semantic_cache=self._news_cache, query=query
+        )
 
     async def search_flights(
         self, 
@@ -40,23 +220,15 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for flight information."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_flights",
-                "departure_id": departure,
-                "arrival_id": arrival,
-                "outbound_date": date,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("flights", [])
-            except Exception as e:
-                print(f"Error searching flights: {e}")
-                return []
+        params = {
+            "engine": "google_flights",
+            "departure_id": departure,
+            "arrival_id": arrival,
+            "outbound_date": date,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        return await self._get_results("google_flights", params)
 
     async def search_hotels(
         self,
@@ -66,44 +238,28 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for hotels."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_hotels",
-                "q": location,
-                "check_in_date": check_in,
-                "check_out_date": check_out,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("hotels", [])
-            except Exception as e:
-                print(f"Error searching hotels: {e}")
-                return []
+        params = {
+            "engine": "google_hotels",
+            "q": location,
+            "check_in_date": check_in,
+            "check_out_date": check_out,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        return await self._get_results("google_hotels", params)
 
     async def search_jobs(self, query: str, location: str = "", num_results: int = 5) -> List[Dict[str, Any]]:
         """Search for jobs using SerpApi Google Jobs."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "engine": "google_jobs",
-                "q": query,
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            if location:
-                params["location"] = location
+        params = {
+            "engine": "google_jobs",
+            "q": query,
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        if location:
+            params["location"] = location
                 
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                return data.get("jobs_results", [])
-            except Exception as e:
-                print(f"Error searching jobs: {e}")
-                return []
+        return await self._get_results("google_jobs", params)
 
     async def search_recipes(
         self, 
@@ -111,22 +267,15 @@ class SerpApiService:
         num_results: int = 5
     ) -> List[Dict[str, Any]]:
         """Search for recipes with ratings and ingredients."""
-        import httpx
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": query,
-                "tbm": "lcl",  # Local results which include recipes
-                "api_key": self.api_key,
-                "num": num_results,
-            }
-            try:
-                response = await client.get(f"{self.base_url}/search", params=params)
-                data = response.json()
-                # Return local/recipe results
-                return data.get("local_results", [])
-            except Exception as e:
-                print(f"Error searching recipes: {e}")
-                return []
+        params = {
+            "q": query,
+            "tbm": "lcl",  # Local results which include recipes
+            "api_key": self.api_key,
+            "num": num_results,
+        }
+        return await self._get_results(
+            "recipes", params, semantic_cache=self._recipes_cache, query=query
+        )
 
 
 class Mem0Service:
@@ -136,8 +285,24 @@ class Mem0Service:
         """Initialize Mem0 service with official SDK."""
         if not settings.mem0_api_key:
             raise ValueError("MEM0_API_KEY not configured")
-        from mem0 import MemoryClient
         self.client = MemoryClient(api_key=settings.mem0_api_key)
+        # Memory search is keyed by user; one small semantic cache each so
+        # one user's paraphrase can never surface another user's memories
+        self._search_caches: Dict[str, SemanticCache] = {}
+        # (user_id, query, limit) -> (expiry, results)
+        self._recent: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Probe once whether this SDK build accepts filtered get_all, so
+        # each list call takes a single known-good path instead of a
+        # failed attempt plus a fallback search
+        try:
+            self.client.get_all(filters={"user_id": "_probe"}, limit=1)
+            self._list_fn = self.client.get_all
+        except (TypeError, AttributeError):
+            self._list_fn = functools.partial(self.client.search, query="*")
+        except Exception:
+            # Signature accepted; a network/auth failure here doesn't
+            # change which API to use
+            self._list_fn = self.client.get_all
 
     async def add_memory(
         self,
@@ -152,11 +317,25 @@ class Mem0Service:
                 user_id=user_id,
                 metadata=metadata or {}
             )
+            # The write changes what retrieval should return; drop the
+            # user's cached listings so the next read reflects it
+            self.invalidate(user_id)
             return result if result else {}
         except Exception as e:
-            print(f"Error adding memory: {e}")
+            logger.exception("Error adding memory")
             return {}
 
+    def invalidate(self, user_id: str) -> None:
+        """Drop cached retrievals for a user after their memories change.
+
+        Clears both the short-TTL listing cache and the user's semantic
+        search cache, so fresh writes show up immediately instead of
+        waiting out the TTL.
+        """
+        for key in [k for k in self._recent if k[0] == user_id]:
+            del self._recent[key]
+        self._search_caches.pop(user_id, None)
+
     async def retrieve_memories(
         self,
         user_id: str,
@@ -168,22 +347,35 @@ class Mem0Service:
             # For v2, filters are often required.
             # Passing filters as a dictionary is the standard way in many v2 SDKs.
             filters = {"user_id": user_id}
-            
+
+            cache_key = (user_id, query, limit)
+            entry = self._recent.get(cache_key)
+            if entry is not None:
+                expires_at, cached = entry
+                if time.monotonic() < expires_at:
+                    self._recent.move_to_end(cache_key)
+                    return cached
+                del self._recent[cache_key]
+
             if query:
+                cache = self._search_caches.setdefault(
+                    user_id, SemanticCache(max_entries=64, ttl=60.0)
+                )
+                semantic_hit, query_vec = await cache.lookup(query)
+                if semantic_hit is not None:
+                    return semantic_hit
                 results = self.client.search(query, filters=filters, limit=limit)
+                cache.store(query_vec, results if results else [])
             else:
-                # Use get_all with filters if strictly supported, or search with wildcard/generic query + filters
-                # If get_all doesn't accept filters in this SDK version, we fall back to search.
-                # Let's try get_all with filters first as per error hint.
-                try:
-                    results = self.client.get_all(filters=filters, limit=limit)
-                except Exception:
-                    # Fallback to search with a generic query if get_all fails
-                    results = self.client.search(query="*", filters=filters, limit=limit)
-            
-            return results if results else []
+                results = self._list_fn(filters=filters, limit=limit)
+
+            results = results if results else []
+            self._recent[cache_key] = (time.monotonic() + _MEM0_RESULT_TTL, results)
+            if len(self._recent) > _MEM0_CACHE_MAX:
+                self._recent.popitem(last=False)
+            return results
         except Exception as e:
-            print(f"Error retrieving memories: {e}")
+            logger.exception("Error retrieving memories")
             return []
 
     async def delete_memory(
@@ -195,17 +387,35 @@ class Mem0Service:
             self.client.delete(memory_id)
             return True
         except Exception as e:
-            print(f"Error deleting memory: {e}")
+            logger.exception("Error deleting memory")
             return False
 
 
+# Query-embedding cache shared across ChromaDBService instances: Chroma
+# re-embeds query_texts on every call, so repeated/common queries reuse
+# the vector instead. Keyed by SHA-256 of the query string.
+_query_embedding_cache: "OrderedDict[str, Any]" = OrderedDict()
+_QUERY_EMBED_CACHE_MAX = 4096
+
+# Docs per collection.add call; bounds each HNSW insertion burst
+_ADD_BATCH_SIZE = 512
+
+# Rough prompt budget for RAG context (~4 chars per token keeps the
+# prompt comfortably inside the model window without a tokenizer dep)
+_RAG_CONTEXT_CHAR_BUDGET = 24_000
+
+# Chroma's query/add are synchronous and CPU-bound (HNSW walk / insert);
+# run them here so the event loop keeps serving other requests, with a
+# small worker cap so parallel BLAS calls don't fight for cores
+_chroma_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chroma")
+
+
 class ChromaDBService:
     """Service for ChromaDB - multi-PDF RAG with Groq."""
 
     def __init__(self):
         """Initialize ChromaDB service."""
         try:
-            import chromadb
             self.client = chromadb.PersistentClient(
                 path=settings.chromadb_persist_directory
             )
@@ -213,9 +423,19 @@ class ChromaDBService:
                 name=settings.chromadb_collection_name
             )
         except Exception as e:
-            print(f"Error initializing ChromaDB: {e}")
+            logger.exception("Error initializing ChromaDB")
             self.client = None
             self.collection = None
+        # One Groq client reused across RAG generations; building one per
+        # call paid a fresh TLS handshake every response
+        self._groq = None
+        if settings.groq_api:
+            self._groq = AsyncGroq(api_key=settings.groq_api.strip())
+
+    async def aclose(self) -> None:
+        """Close the pooled Groq client; wire into app shutdown."""
+        if self._groq:
+            await self._groq.close()
 
     async def add_documents(
         self,
@@ -229,16 +449,56 @@ class ChromaDBService:
                 return False
                 
             if not ids:
-                ids = [f"doc_{i}" for i in range(len(documents))]
-            
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas or [{}] * len(documents),
-                ids=ids,
+                # Content-hashed IDs are stable across calls; index-based
+                # doc_{i} IDs restarted at doc_0 every batch and silently
+                # overwrote earlier documents
+                ids = [
+                    hashlib.blake2b(d.encode(), digest_size=12).hexdigest()
+                    for d in documents
+                ]
+            metadatas = metadatas or [{}] * len(documents)
+
+            # Drop anything already stored (or repeated in this batch) so
+            # re-ingesting a PDF doesn't re-embed unchanged chunks
+            existing = await asyncio.get_running_loop().run_in_executor(
+                _chroma_executor, functools.partial(self.collection.get, ids=ids)
             )
+            seen = set(existing.get("ids") or [])
+            keep = []
+            for i, doc_id in enumerate(ids):
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    keep.append(i)
+            if not keep:
+                return True
+            if len(keep) < len(documents):
+                documents = [documents[i] for i in keep]
+                metadatas = [metadatas[i] for i in keep]
+                ids = [ids[i] for i in keep]
+
+            # Embed everything in one vectorized pass rather than letting
+            # Chroma encode each batch internally
+            embeddings = None
+            if EMBEDDINGS_AVAILABLE and documents:
+                vecs = await asyncio.to_thread(encode_documents, documents)
+                embeddings = vecs.tolist()
+
+            for start in range(0, len(documents), _ADD_BATCH_SIZE):
+                end = start + _ADD_BATCH_SIZE
+                batch_kwargs = {
+                    "documents": documents[start:end],
+                    "metadatas": metadatas[start:end],
+                    "ids": ids[start:end],
+                }
+                if embeddings is not None:
+                    batch_kwargs["embeddings"] = embeddings[start:end]
+                await asyncio.get_running_loop().run_in_executor(
+                    _chroma_executor,
+                    functools.partial(self.collection.add, **batch_kwargs),
+                )
             return True
         except Exception as e:
-            print(f"Error adding documents: {e}")
+            logger.exception("Error adding documents")
             return False
 
     async def query_documents(
@@ -250,24 +510,44 @@ class ChromaDBService:
         try:
             if not self.collection:
                 return []
-                
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=num_results
+
+            if EMBEDDINGS_AVAILABLE:
+                # Embed (or reuse) the query ourselves and bypass Chroma's
+                # internal embedding pass; same MiniLM model either way
+                key = hashlib.sha256(query.encode()).hexdigest()
+                vec = _query_embedding_cache.get(key)
+                if vec is None:
+                    vec = await asyncio.to_thread(encode_query, query)
+                    _query_embedding_cache[key] = vec
+                    if len(_query_embedding_cache) > _QUERY_EMBED_CACHE_MAX:
+                        _query_embedding_cache.popitem(last=False)
+                else:
+                    _query_embedding_cache.move_to_end(key)
+                query_kwargs = {"query_embeddings": [vec[0].tolist()]}
+            else:
+                query_kwargs = {"query_texts": [query]}
+
+            results = await asyncio.get_running_loop().run_in_executor(
+                _chroma_executor,
+                functools.partial(
+                    self.collection.query, n_results=num_results, **query_kwargs
+                ),
             )
             
-            formatted_results = []
-            if results and results.get("documents"):
-                for i, doc in enumerate(results["documents"][0]):
-                    formatted_results.append({
-                        "document": doc,
-                        "distance": results.get("distances", [[]])[0][i] if results.get("distances") else None,
-                        "metadata": results.get("metadatas", [[]])[0][i] if results.get("metadatas") else None,
-                    })
-            
-            return formatted_results
+            if not results or not results.get("documents"):
+                return []
+
+            # One zip over the parallel inner lists instead of repeated
+            # nested .get()[0][i] indexing per element
+            docs = results["documents"][0]
+            distances = (results.get("distances") or [[None] * len(docs)])[0]
+            metadatas = (results.get("metadatas") or [[None] * len(docs)])[0]
+            return [
+                {"document": doc, "distance": distance, "metadata": metadata}
+                for doc, distance, metadata in zip(docs, distances, metadatas)
+            ]
         except Exception as e:
-            print(f"Error querying documents: {e}")
+            logger.exception("Error querying documents")
             return []
 
     async def generate_rag_response(
@@ -277,17 +557,30 @@ class ChromaDBService:
     ) -> str:
         """Generate response using RAG with Groq LLM."""
         try:
-            from groq import AsyncGroq
-            
+            if not self._groq:
+                logger.warning("GROQ_API not configured for RAG generation")
+                return ""
+
             if not context_documents:
                 context_documents = await self.query_documents(query)
                 context_documents = [doc.get("document", "") for doc in context_documents]
             
-            context = "\n\n".join(context_documents)
-            
-            client = AsyncGroq(api_key=settings.groq_api)
-            message = await client.chat.completions.create(
-                model="mixtral-8x7b-32768",
+            # Trim context to budget instead of joining everything blindly
+            context_parts = []
+            budget = _RAG_CONTEXT_CHAR_BUDGET
+            for doc in context_documents:
+                if len(doc) > budget:
+                    break
+                context_parts.append(doc)
+                budget -= len(doc) + 2
+            context = "\n\n".join(context_parts)
+
+            # Short questions rarely need long answers; a tighter cap
+            # lets the scheduler start returning tokens sooner
+            max_tokens = 512 if len(query) < 120 else 1024
+
+            stream = await self._groq.chat.completions.create(
+                model=settings.rag_model,
                 messages=[
                     {
                         "role": "system",
@@ -299,16 +592,54 @@ class ChromaDBService:
                     }
                 ],
                 temperature=0.7,
-                max_tokens=1024,
+                max_tokens=max_tokens,
+                stream=True,
             )
-            
-            return message.choices[0].message.content
+
+            parts = []
+            async for chunk in stream:
+                choices = chunk.choices
+                delta = choices[0].delta if choices else None
+                if delta and delta.content:
+                    parts.append(delta.content)
+            return "".join(parts)
         except Exception as e:
-            print(f"Error generating RAG response: {e}")
+            logger.exception("Error generating RAG response")
             return ""
 
 
-# Global service instances
-serpapi_service = SerpApiService()
-mem0_service = Mem0Service()
-chromadb_service = ChromaDBService()
+# Lazy service singletons: constructing these at import time validated
+# API keys and opened Chroma's persistent store before anything needed
+# them, and one missing env var took the whole module down. lru_cache
+# builds each service on first call and returns the same instance after.
+@functools.lru_cache(maxsize=1)
+def get_serpapi_service() -> SerpApiService:
+    return SerpApiService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_mem0_service() -> Mem0Service:
+    return Mem0Service()
+
+
+@functools.lru_cache(maxsize=1)
+def get_chromadb_service() -> ChromaDBService:
+    return ChromaDBService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_vector_store():
+    """Active document store for the RAG path; both backends expose the
+    same add_documents/query_documents surface."""
+    if settings.vector_backend == "faiss":
+        from services.faiss_store import FAISSVectorStore
+        store = FAISSVectorStore()
+        if store.index is not None:
+            return store
+        # A config flag plus a missing optional dep must not reduce
+        # retrieval to empty results; use the working backend instead
+        logger.warning(
+            "vector_backend=faiss but faiss/sentence-transformers are "
+            "not installed; falling back to the Chroma store"
+        )
+    return get_chromadb_service()
@@ -1,8 +1,49 @@
 """Voice service for STT and TTS operations using Groq API."""
+import asyncio
 import io
-from typing import Optional
+import logging
+import wave
+from collections import deque
+from typing import AsyncIterator, Optional, Tuple
+
+from groq import AsyncGroq
+from gtts import gTTS
+from openai import AsyncOpenAI
+
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+try:
+    from pydub import AudioSegment
+    _PYDUB_AVAILABLE = True
+except ImportError:
+    _PYDUB_AVAILABLE = False
+
+
+# Reusable BytesIO pool: voice chat shuttles multi-MB buffers through
+# every call, and recycling them spares the allocator/GC that churn
+_bio_pool: deque = deque(maxlen=16)
+
+
+def _acquire_bio(initial: "bytes | memoryview" = b"") -> io.BytesIO:
+    """Pop a recycled buffer (or make one) positioned at 0 with `initial`."""
+    try:
+        buf = _bio_pool.pop()
+    except IndexError:
+        return io.BytesIO(initial)
+    if initial:
+        buf.write(initial)
+        buf.seek(0)
+    return buf
+
+
+def _release_bio(buf: io.BytesIO) -> None:
+    """Clear a buffer and return it to the pool."""
+    buf.seek(0)
+    buf.truncate()
+    _bio_pool.append(buf)
+
 
 class VoiceService:
     """Service for voice interactions (STT and TTS) using Groq API."""
@@ -13,47 +54,169 @@ class VoiceService:
         self.openai_client = None
         
         if settings.groq_api:
-            from groq import AsyncGroq
             self.groq_client = AsyncGroq(api_key=settings.groq_api.strip())
         
         # OpenAI client for TTS (Groq doesn't have native TTS yet)
         if settings.openai_api_key:
-            from openai import AsyncOpenAI
             self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
 
-    async def transcribe_audio(self, audio_bytes: bytes) -> str:
+        # Local Piper TTS: in-process ONNX inference, so synthesis costs
+        # no network round trip and can't be rate limited. Loaded once
+        # when a voice model is configured.
+        self._piper = None
+        if settings.piper_voice_model:
+            try:
+                from piper import PiperVoice
+                self._piper = PiperVoice.load(settings.piper_voice_model)
+            except Exception as e:
+                logger.warning("[TTS] Could not load Piper voice model: %s", e)
+
+    async def aclose(self) -> None:
+        """Close the pooled API clients; wire into app shutdown."""
+        if self.groq_client:
+            await self.groq_client.close()
+        if self.openai_client:
+            await self.openai_client.close()
+
+    async def transcribe_audio(self, audio_bytes: "bytes | memoryview") -> str:
         """
         Transcribe audio using Groq (Whisper).
-        
+
         Args:
-            audio_bytes: Raw audio bytes
-            
+            audio_bytes: Raw audio as any bytes-like object. Passing a
+                memoryview (e.g. BytesIO.getbuffer()) avoids an extra
+                full-buffer copy on the caller's side.
+
         Returns:
             Transcribed text
         """
         if not self.groq_client:
-            print("GROQ_API not configured for STT")
+            logger.warning("GROQ_API not configured for STT")
             return ""
 
         try:
-            # Create a file-like object
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "audio.wav"  # Groq requires a filename
-            
-            transcription = await self.groq_client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-large-v3",
-                response_format="text",
-                temperature=0.0
+            # Create a file-like object (Groq requires a filename)
+            payload, filename = await asyncio.to_thread(
+                self._compress_for_upload, audio_bytes
             )
+            audio_file = _acquire_bio(payload)
+            audio_file.name = filename
+            try:
+                transcription = await self.groq_client.audio.transcriptions.create(
+                    file=audio_file,
+                    model="whisper-large-v3",
+                    response_format="text",
+                    temperature=0.0
+                )
+            finally:
+                _release_bio(audio_file)
             
             result = str(transcription).strip()
-            print(f"[STT] Transcribed: {result[:100]}...")
+            logger.debug("[STT] Transcribed: %.100s...", result)
             return result
         except Exception as e:
-            print(f"Error transcribing audio with Groq: {e}")
+            logger.exception("Error transcribing audio with Groq")
             return ""
 
+    @staticmethod
+    def _compress_for_upload(audio_bytes: "bytes | memoryview") -> Tuple[bytes, str]:
+        """Transcode WAV to Opus before upload when pydub/ffmpeg is present.
+
+        Speech PCM compresses ~11x at 24 kbps with no accuracy loss, so
+        a 30-second clip uploads ~90 KB instead of ~1 MB. Returns
+        (payload, filename); non-WAV input or a missing codec falls back
+        to the raw bytes.
+        """
+        if _PYDUB_AVAILABLE:
+            wav_in = _acquire_bio(audio_bytes)
+            out = _acquire_bio()
+            try:
+                segment = AudioSegment.from_wav(wav_in)
+                segment.export(out, format="ogg", codec="libopus", bitrate="24k")
+                return out.getvalue(), "audio.ogg"
+            except Exception as e:
+                logger.warning("[STT] Opus transcode failed, uploading WAV: %s", e)
+            finally:
+                _release_bio(wav_in)
+                _release_bio(out)
+        return bytes(audio_bytes), "audio.wav"
+
+    async def transcribe_audio_stream(
+        self,
+        audio_bytes: "bytes | memoryview",
+        chunk_seconds: float = 10.0,
+    ) -> AsyncIterator[str]:
+        """
+        Transcribe audio incrementally, yielding text as it becomes available.
+
+        Groq's Whisper endpoint only returns complete transcripts, so long
+        WAV recordings are split into ~chunk_seconds segments and each
+        segment's text is yielded as soon as it transcribes — the first
+        words reach the caller while later audio is still being processed.
+        Short clips and non-WAV formats fall back to one-shot transcription.
+
+        Args:
+            audio_bytes: Raw audio as any bytes-like object.
+            chunk_seconds: Target segment length for long recordings.
+
+        Yields:
+            Transcribed text fragments in playback order.
+        """
+        if not self.groq_client:
+            logger.warning("GROQ_API not configured for STT")
+            return
+
+        try:
+            wav_file = wave.open(io.BytesIO(audio_bytes), "rb")
+        except (wave.Error, EOFError):
+            # No WAV header to find frame boundaries in; transcribe whole
+            text = await self.transcribe_audio(audio_bytes)
+            if text:
+                yield text
+            return
+
+        with wav_file:
+            params = wav_file.getparams()
+            frames_per_chunk = int(params.framerate * chunk_seconds)
+            if params.nframes <= frames_per_chunk:
+                text = await self.transcribe_audio(audio_bytes)
+                if text:
+                    yield text
+                return
+
+            while True:
+                frames = wav_file.readframes(frames_per_chunk)
+                if not frames:
+                    break
+                segment_io = _acquire_bio()
+                try:
+                    with wave.open(segment_io, "wb") as segment:
+                        segment.setparams(params)
+                        segment.writeframes(frames)
+                    payload, filename = await asyncio.to_thread(
+                        self._compress_for_upload, segment_io.getvalue()
+                    )
+                finally:
+                    _release_bio(segment_io)
+                upload_io = _acquire_bio(payload)
+                upload_io.name = filename
+                try:
+                    transcription = await self.groq_client.audio.transcriptions.create(
+                        file=upload_io,
+                        model="whisper-large-v3",
+                        response_format="text",
+                        temperature=0.0
+                    )
+                except Exception as e:
+                    logger.exception("Error transcribing audio segment with Groq")
+                    return
+                finally:
+                    _release_bio(upload_io)
+                text = str(transcription).strip()
+                if text:
+                    logger.debug("[STT] Transcribed segment: %.100s...", text)
+                    yield text
+
     async def text_to_speech(self, text: str, voice: str = "alloy") -> Optional[bytes]:
         """
         Convert text to speech using OpenAI TTS API (high quality).
@@ -67,13 +230,24 @@ class VoiceService:
             Audio bytes (mp3) or None
         """
         if not text or not text.strip():
-            print("[TTS] No text provided")
+            logger.debug("[TTS] No text provided")
             return None
-            
+
+        # Local Piper voice first: warm in-process inference beats any
+        # network TTS on latency
+        if self._piper:
+            try:
+                audio_bytes = await asyncio.to_thread(self._piper_synthesize, text)
+                if audio_bytes:
+                    logger.debug("[TTS] Generated %d bytes via Piper", len(audio_bytes))
+                    return audio_bytes
+            except Exception as e:
+                logger.warning("Error with Piper TTS, falling back: %s", e)
+
         # Try OpenAI TTS first (higher quality)
         if self.openai_client:
             try:
-                print(f"[TTS] Using OpenAI TTS for text: {text[:50]}...")
+                logger.debug("[TTS] Using OpenAI TTS for text: %.50s...", text)
                 response = await self.openai_client.audio.speech.create(
                     model="tts-1",
                     voice=voice,
@@ -83,14 +257,24 @@ class VoiceService:
                 
                 # Get the audio bytes
                 audio_bytes = response.content
-                print(f"[TTS] Generated {len(audio_bytes)} bytes of audio")
+                logger.debug("[TTS] Generated %d bytes of audio", len(audio_bytes))
                 return audio_bytes
                 
             except Exception as e:
-                print(f"Error with OpenAI TTS: {e}, falling back to gTTS")
+                logger.warning("Error with OpenAI TTS, falling back to gTTS: %s", e)
         
         # Fallback to gTTS (free but lower quality)
         return await self._gtts_fallback(text)
+
+    def _piper_synthesize(self, text: str) -> bytes:
+        """Synthesize text to WAV bytes with the loaded Piper voice."""
+        wav_io = _acquire_bio()
+        try:
+            with wave.open(wav_io, "wb") as wav_file:
+                self._piper.synthesize(text, wav_file)
+            return wav_io.getvalue()
+        finally:
+            _release_bio(wav_io)
     
     async def _gtts_fallback(self, text: str) -> Optional[bytes]:
         """
@@ -103,9 +287,7 @@ class VoiceService:
             Audio bytes or None
         """
         try:
-            from gtts import gTTS
-
-            print(f"[TTS] Using gTTS fallback for text: {text[:50]}...")
+            logger.debug("[TTS] Using gTTS fallback for text: %.50s...", text)
 
             # Try different configurations if the first fails
             configs = [
@@ -118,34 +300,37 @@ class VoiceService:
             for config in configs:
                 try:
                     # Create a file-like object
-                    fp = io.BytesIO()
+                    fp = _acquire_bio()
 
-                    # Generate speech
-                    tts = gTTS(text=text, **config)
-                    tts.write_to_fp(fp)
+                    try:
+                        # Generate speech
+                        tts = gTTS(text=text, **config)
+                        tts.write_to_fp(fp)
 
-                    # Get bytes
-                    fp.seek(0)
-                    audio_bytes = fp.getvalue()
+                        # Get bytes
+                        fp.seek(0)
+                        audio_bytes = fp.getvalue()
+                    finally:
+                        _release_bio(fp)
 
                     if audio_bytes and len(audio_bytes) > 1000:  # Ensure we got real audio
-                        print(f"[TTS] Generated {len(audio_bytes)} bytes via gTTS (tld: {config.get('tld', 'com')})")
+                        logger.debug("[TTS] Generated %d bytes via gTTS (tld: %s)", len(audio_bytes), config.get("tld", "com"))
                         return audio_bytes
                     else:
-                        print(f"[TTS] gTTS returned empty or too small audio ({len(audio_bytes) if audio_bytes else 0} bytes)")
+                        logger.debug("[TTS] gTTS returned empty or too small audio (%d bytes)", len(audio_bytes) if audio_bytes else 0)
                         continue
 
                 except Exception as config_error:
                     last_error = config_error
-                    print(f"[TTS] gTTS config failed (tld: {config.get('tld', 'com')}): {config_error}")
+                    logger.warning("[TTS] gTTS config failed (tld: %s): %s", config.get("tld", "com"), config_error)
                     continue
 
             # If all configs failed
-            print(f"[TTS] All gTTS configurations failed. Last error: {last_error}")
+            logger.warning("[TTS] All gTTS configurations failed. Last error: %s", last_error)
             return None
 
         except Exception as e:
-            print(f"[TTS] Error with gTTS fallback: {e}")
+            logger.exception("[TTS] Error with gTTS fallback")
             return None
 
 